@@ -0,0 +1,102 @@
+# benchmark_agent.py
+"""
+Mesure le surcoût de la boucle d'agent LangChain, hors latence du modèle.
+
+Le modèle est remplacé par ScriptedReActLLM (src/llm_backends.py), qui
+rejoue une trace ReAct fixe : une action puis une réponse finale. L'agent
+est construit avec les mêmes options que DataBot (ZERO_SHOT_REACT_DESCRIPTION,
+max_iterations=3, handle_parsing_errors=True) et des outils aux mêmes noms,
+mais sans travail réel, pour isoler :
+  - la construction de l'agent (initialize_agent)
+  - l'analyse des sorties du modèle (parser ReAct)
+  - l'appel d'un outil (Tool.run)
+  - une question complète (agent.run), latence simulée déduite
+
+Usage:
+    python benchmark_agent.py --questions 200 --latency 0.05
+"""
+
+import argparse
+import statistics
+import time
+
+from langchain.agents import AgentType, initialize_agent
+from langchain.tools import Tool
+
+from src.llm_backends import DEFAULT_TRACE, ScriptedReActLLM
+
+TOOL_NAMES = {
+    "AnalyseurDonnees": "Analyse les données de vente, produits, CA, stocks",
+    "GenerateurRapports": "Génère des rapports commerciaux détaillés",
+    "GenerateurGraphiques": "Crée des graphiques à partir des données",
+}
+
+
+def build_agent(llm):
+    tools = [Tool(name=name, func=lambda _: "ok", description=description)
+             for name, description in TOOL_NAMES.items()]
+    agent = initialize_agent(
+        tools=tools,
+        llm=llm,
+        agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
+        verbose=False,
+        max_iterations=3,
+        handle_parsing_errors=True
+    )
+    return agent, tools
+
+
+def timed(func, repeat):
+    """Durées (secondes) de `repeat` appels à func"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def report(label, samples):
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{label:32} moy {statistics.fmean(ordered) * 1000:8.3f} ms | "
+          f"p50 {ordered[len(ordered) // 2] * 1000:8.3f} ms | p95 {p95 * 1000:8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la boucle d'agent DataBot")
+    parser.add_argument("--questions", type=int, default=100, help="Nombre de questions")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Latence simulée par appel au modèle (secondes)")
+    parser.add_argument("--builds", type=int, default=20, help="Nombre de constructions d'agent")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("⏱️  BENCHMARK AGENT DATABOT (modèle local scripté)")
+    print("=" * 70)
+
+    report("initialize_agent", timed(lambda: build_agent(ScriptedReActLLM()), args.builds))
+
+    llm = ScriptedReActLLM(latency=args.latency)
+    agent, tools = build_agent(llm)
+
+    parse = agent.agent.output_parser.parse
+    report("parsing action", timed(lambda: parse(DEFAULT_TRACE[0]), 1000))
+    report("parsing réponse finale", timed(lambda: parse(DEFAULT_TRACE[1]), 1000))
+    report("dispatch outil (Tool.run)", timed(lambda: tools[0].run("ventes.csv"), 1000))
+
+    calls_before = llm.calls
+    samples = timed(lambda: agent.run("Analyse les ventes"), args.questions)
+    calls_per_question = (llm.calls - calls_before) / args.questions
+    overhead = [s - calls_per_question * args.latency for s in samples]
+    report("question complète", samples)
+    report("surcoût agent par question", overhead)
+
+    print("-" * 70)
+    print(f"Appels modèle par question : {calls_per_question:.1f} "
+          f"(latence simulée {args.latency * 1000:.0f} ms/appel)")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,11 @@
 # databot_agent.py - VERSION SIMPLIFIÉE et GARANTIE
 import pandas as pd
-from datetime import datetime
 from modules.db_connector import DatabaseConnector
 from modules.chart_generator import ChartGenerator
 from modules.memory_manager import MemoryManager
+from modules.dataset_cache import load_dataset
+from src.router import prepare_sales
+from src.tools.report_generator import ReportGenerator
 
 print("="*70)
 print("🤖 DATABOT - Assistant Commercial Intelligent")
@@ -30,16 +32,25 @@ print("📁 Fichier : 'ventes.csv'")
 # ==================== PARTIE 2 : FONCTIONS D'ANALYSE ====================
 print("\n🛠️  PHASE 2 : Création des fonctions d'analyse...")
 
+def charger_ventes():
+    """
+    ventes.csv depuis le cache (relu seulement si le fichier a changé).
+
+    Même dérivation que le routeur et les outils de l'agent : le cache ne
+    garde qu'une copie du fichier.
+    """
+    return load_dataset('ventes.csv', derive=prepare_sales)
+
 def analyse_rapide(question):
     """Analyse simple des données"""
-    df = pd.read_csv('ventes.csv')
+    df = charger_ventes()
     
     if "plus vendu" in question.lower():
-        meilleur = df.loc[(df['Ventes_Q1'] + df['Ventes_Q2']).idxmax()]
-        return f"Produit le plus vendu : {meilleur['Produit']} ({meilleur['Ventes_Q1']+meilleur['Ventes_Q2']} unités)"
+        meilleur = df.loc[df['Ventes_Total'].idxmax()]
+        return f"Produit le plus vendu : {meilleur['Produit']} ({meilleur['Ventes_Total']} unités)"
     
     elif "chiffre" in question.lower() or "ca" in question.lower():
-        total = sum((df['Ventes_Q1'] + df['Ventes_Q2']) * df['Prix'])
+        total = df['CA'].sum()
         return f"Chiffre d'affaires : {total:.2f} €"
     
     elif "liste" in question.lower():
@@ -53,25 +64,12 @@ def analyse_rapide(question):
     
     return f"Données disponibles : {len(df)} produits, {df['Ventes_Q1'].sum()+df['Ventes_Q2'].sum()} ventes totales"
 
-def rapport_complet():
-    """Génère un rapport complet"""
-    df = pd.read_csv('ventes.csv')
-    df['Ventes_Total'] = df['Ventes_Q1'] + df['Ventes_Q2']
-    
-    rapport = f"""📊 RAPPORT COMMERCIAL - {datetime.now().strftime('%d/%m/%Y')}
-    
-Produits analysés : {len(df)}
-Ventes totales : {df['Ventes_Total'].sum()} unités
-CA total : {(df['Ventes_Total'] * df['Prix']).sum():.2f} €
-Stock total : {df['Stock'].sum()} unités
+# Sections du rapport en cache : seules celles dont les données ont changé sont recalculées
+generateur_rapports = ReportGenerator('ventes.csv', top_n=2)
 
-Top produits :
-"""
-    top = df.nlargest(2, 'Ventes_Total')
-    for _, row in top.iterrows():
-        rapport += f"• {row['Produit']} : {row['Ventes_Total']} ventes\n"
-    
-    return rapport
+def rapport_complet(demande=""):
+    """Génère un rapport complet"""
+    return generateur_rapports.generate(demande)
 
 # ==================== PARTIE 3 : VERSION AVEC ou SANS LANGCHAIN ====================
 print("\n🧠 PHASE 3 : Configuration de l'assistant...")
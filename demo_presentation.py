@@ -1,5 +1,6 @@
 # demo_presentation.py
 from src.agent import DataBot
+import asyncio
 import time
 
 def demonstrate_for_jury():
@@ -40,11 +41,15 @@ def demonstrate_for_jury():
         print(f"\n{scenario['title']}")
         print("-"*40)
         
-        for question in scenario['questions']:
+        # Les questions d'un scénario sont traitées en parallèle
+        start = time.perf_counter()
+        responses = asyncio.run(bot.ask_many(scenario['questions']))
+        print(f"⏱️  {len(responses)} réponses en {time.perf_counter() - start:.1f}s")
+        
+        for question, response in zip(scenario['questions'], responses):
             print(f"\n👤 Jury: {question}")
             time.sleep(1)
             
-            response = bot.ask(question)
             print(f"🤖 DataBot: {response}")
             time.sleep(2)
     
@@ -1,15 +1,289 @@
 # modules/chart_generator.py - VERSION CORRIGÉE
+import functools
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 import pandas as pd
 
+# Taille maximale des données envoyées au navigateur, quel que soit le volume source
+MAX_BARS = 20        # barres / parts (les suivantes regroupées dans « Autres »)
+MAX_POINTS = 1000    # points par série temporelle (sous-échantillonnage LTTB)
+
+# Au-delà de WEBGL_THRESHOLD points, tracés WebGL (Scattergl) au lieu de SVG ;
+# au-delà de DENSITY_THRESHOLD, un nuage de points devient une carte de densité
+WEBGL_THRESHOLD = 10_000
+DENSITY_THRESHOLD = 500_000
+
+
+def top_n(data, label_col, value_col, n=MAX_BARS, other_label="Autres"):
+    """
+    Agrège value_col par label_col et garde les n plus grandes valeurs.
+    
+    Les suivantes sont additionnées dans une catégorie « Autres » : le
+    résultat a au plus n lignes, triées par valeur décroissante.
+    """
+    totals = (data.groupby(label_col, sort=False, observed=True)[value_col]
+              .sum()
+              .sort_values(ascending=False))
+    if len(totals) > n:
+        rest = totals.iloc[n - 1:].sum()
+        totals = totals.iloc[:n - 1]
+        totals.loc[other_label] = rest
+    return totals.rename_axis(label_col).reset_index()
+
+
+def aggregate_series(data, x_col, y_col, freq=None, color_col=None):
+    """
+    Somme y_col par valeur de x_col (et par série color_col).
+    
+    Avec freq ('D', 'W', 'M'...), x_col est converti en dates et regroupé
+    par période : une ligne par période et par série au lieu d'une ligne
+    par transaction.
+    """
+    keys = [x_col] + ([color_col] if color_col else [])
+    frame = data[keys + [y_col]]
+    if freq:
+        periods = pd.to_datetime(frame[x_col], errors="coerce").dt.to_period(freq)
+        frame = frame.assign(**{x_col: periods.dt.start_time})
+    return frame.groupby(keys, sort=True, observed=True)[y_col].sum().reset_index()
+
+
+def lttb(x, y, threshold):
+    """
+    Indices des points gardés par l'algorithme Largest-Triangle-Three-Buckets.
+    
+    Conserve la forme visuelle de la courbe (pics et creux) avec
+    `threshold` points, premier et dernier compris.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    
+    # Bornes des seaux intérieurs (le premier et le dernier point sont gardés)
+    edges = (np.arange(threshold - 1) * (n - 2) / (threshold - 2)).astype(int) + 1
+    edges[-1] = n - 1
+    selected = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean() if next_end > end else x[-1]
+        avg_y = y[end:next_end].mean() if next_end > end else y[-1]
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a])
+                      - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def downsample(data, x_col, y_col, max_points=MAX_POINTS, color_col=None):
+    """Réduit chaque série à max_points points au plus (LTTB), triée par x_col"""
+    groups = data.groupby(color_col, sort=False, observed=True) if color_col else [(None, data)]
+    parts = []
+    for _, series in groups:
+        series = series.sort_values(x_col)
+        x = series[x_col]
+        if pd.api.types.is_datetime64_any_dtype(x):
+            x = x.astype("int64")
+        elif not pd.api.types.is_numeric_dtype(x):
+            x = np.arange(len(series))
+        parts.append(series.iloc[lttb(np.asarray(x), series[y_col].to_numpy(), max_points)])
+    return pd.concat(parts) if parts else data
+
+
+EXPORT_FORMATS = ("png", "svg", "pdf", "jpeg", "webp")
+EXPORT_MANIFEST = ".exports.json"
+
+
+def _export_workers():
+    """Processus de rendu : MAX_WORKERS (.env), sinon nombre de cœurs"""
+    try:
+        return max(1, int(os.getenv("MAX_WORKERS", "")))
+    except ValueError:
+        return os.cpu_count() or 1
+
+
+def _render_batch(jobs):
+    """
+    Rend une liste de (JSON de figure, chemin) dans un processus de rendu.
+    
+    Le moteur d'images (kaleido) est démarré au premier appel du processus
+    puis réutilisé pour les figures suivantes.
+    """
+    for fig_json, path in jobs:
+        pio.write_image(pio.from_json(fig_json), path)
+    return len(jobs)
+
+
+def _render(jobs, max_workers=None):
+    """Rend toutes les images avec un seul moteur, ou un pool de processus à défaut"""
+    if not jobs:
+        return
+    if hasattr(pio, "write_images"):
+        # Plotly >= 6.1 : un seul navigateur kaleido pour tout le lot
+        pio.write_images([pio.from_json(fig_json) for fig_json, _ in jobs],
+                         [path for _, path in jobs])
+        return
+    workers = min(max_workers or _export_workers(), len(jobs))
+    if workers == 1:
+        _render_batch(jobs)
+        return
+    # Un lot par processus : chaque moteur démarre une seule fois
+    batches = [jobs[i::workers] for i in range(workers)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(_render_batch, batches))
+
+
+def frame_fingerprint(data):
+    """Empreinte rapide d'un DataFrame (valeurs, index, colonnes et types)"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((list(data.columns), [str(t) for t in data.dtypes])).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class FigureCache:
+    """
+    Cache LRU des figures construites et de leurs versions sérialisées.
+    
+    La taille d'une entrée est celle de son JSON (plus ses images) ; les
+    entrées les moins récentes sont évincées au-delà de max_entries ou de
+    max_bytes. Les figures sont partagées : ne pas les modifier sur place.
+    """
+    
+    def __init__(self, max_entries=64, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()   # clé -> {"figure", "json", "images", "bytes"}
+        self._keys_by_figure = {}       # id(figure) -> clé
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get_or_build(self, key, build):
+        """Figure en cache pour cette clé, sinon construite par build()"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry["figure"]
+            self.misses += 1
+        
+        fig = build()
+        if fig is None:
+            return None
+        fig_json = fig.to_json()
+        with self._lock:
+            if key in self._entries:
+                return self._entries[key]["figure"]
+            self._entries[key] = {"figure": fig, "json": fig_json, "images": {}, "bytes": len(fig_json)}
+            self._keys_by_figure[id(fig)] = key
+            self._bytes += len(fig_json)
+            self._evict()
+        return fig
+    
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, entry = self._entries.popitem(last=False)
+            self._keys_by_figure.pop(id(entry["figure"]), None)
+            self._bytes -= entry["bytes"]
+    
+    def _entry(self, fig):
+        key = self._keys_by_figure.get(id(fig))
+        return self._entries.get(key) if key is not None else None
+    
+    def to_json(self, fig):
+        """JSON de la figure (mémorisé si elle vient du cache)"""
+        with self._lock:
+            entry = self._entry(fig)
+            if entry is not None:
+                return entry["json"]
+        return fig.to_json()
+    
+    def to_image(self, fig, format="png"):
+        """Image de la figure en octets (mémorisée si elle vient du cache)"""
+        with self._lock:
+            entry = self._entry(fig)
+            if entry is not None and format in entry["images"]:
+                return entry["images"][format]
+        image = pio.to_image(fig, format=format)
+        with self._lock:
+            entry = self._entry(fig)
+            if entry is not None and format not in entry["images"]:
+                entry["images"][format] = image
+                entry["bytes"] += len(image)
+                self._bytes += len(image)
+                self._evict()
+        return image
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_figure.clear()
+            self._bytes = 0
+    
+    def stats(self):
+        """Statistiques du cache"""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+def _memoize(method):
+    """Mémorise une méthode generate_* selon l'empreinte des données et les paramètres"""
+    @functools.wraps(method)
+    def wrapper(data, *args, **kwargs):
+        cache = ChartGenerator.cache
+        if cache is None or not isinstance(data, pd.DataFrame):
+            return method(data, *args, **kwargs)
+        try:
+            key = (method.__name__, frame_fingerprint(data), args, tuple(sorted(kwargs.items())))
+            hash(key)
+        except TypeError:
+            return method(data, *args, **kwargs)
+        return cache.get_or_build(key, lambda: method(data, *args, **kwargs))
+    return wrapper
+
+
 class ChartGenerator:
     """Générateur de graphiques pour DataBot"""
     
+    # Figures partagées par toutes les instances (None pour désactiver)
+    cache = FigureCache()
+    
     @staticmethod
-    def generate_sales_bar(data, x_col='product', y_col='total_quantity', title="Ventes par Produit"):
-        """Génère un graphique à barres des ventes"""
+    @_memoize
+    def generate_sales_bar(data, x_col='product', y_col='total_quantity', title="Ventes par Produit",
+                           max_bars=MAX_BARS):
+        """
+        Génère un graphique à barres des ventes.
+        
+        Les lignes sont agrégées par x_col côté serveur ; au-delà de
+        max_bars produits, les plus petits sont regroupés dans « Autres ».
+        """
         try:
+            data = top_n(data, x_col, y_col, n=max_bars)
             fig = px.bar(
                 data, 
                 x=x_col, 
@@ -29,9 +303,12 @@ class ChartGenerator:
             return None
     
     @staticmethod
-    def generate_revenue_pie(data, value_col='total_revenue', name_col='product', title="Répartition du CA"):
-        """Génère un graphique camembert des revenus"""
+    @_memoize
+    def generate_revenue_pie(data, value_col='total_revenue', name_col='product', title="Répartition du CA",
+                             max_slices=MAX_BARS):
+        """Génère un graphique camembert des revenus (petites parts regroupées dans « Autres »)"""
         try:
+            data = top_n(data, name_col, value_col, n=max_slices)
             fig = px.pie(
                 data, 
                 values=value_col, 
@@ -45,15 +322,29 @@ class ChartGenerator:
             return None
     
     @staticmethod
-    def generate_trend_line(data, x_col='date', y_col='quantity', title="Tendance des Ventes"):
-        """Génère un graphique de tendance linéaire"""
+    @_memoize
+    def generate_trend_line(data, x_col='date', y_col='quantity', title="Tendance des Ventes",
+                            freq=None, color_col=None, max_points=MAX_POINTS):
+        """
+        Génère un graphique de tendance linéaire.
+        
+        Les lignes sont additionnées par date (ou par période freq : 'D',
+        'W', 'M'...) et par série color_col, puis chaque série est réduite à
+        max_points points par LTTB (max_points=None : toutes les dates).
+        Au-delà de WEBGL_THRESHOLD points au total, le tracé passe en WebGL.
+        """
         try:
+            data = aggregate_series(data, x_col, y_col, freq=freq, color_col=color_col)
+            if max_points:
+                data = downsample(data, x_col, y_col, max_points=max_points, color_col=color_col)
             fig = px.line(
                 data, 
                 x=x_col, 
                 y=y_col, 
+                color=color_col,
                 title=title,
-                markers=True
+                markers=len(data) <= 200,
+                render_mode="webgl" if len(data) > WEBGL_THRESHOLD else "svg"
             )
             fig.update_layout(
                 xaxis_title="Date",
@@ -64,6 +355,65 @@ class ChartGenerator:
             print(f"❌ Erreur génération graphique ligne: {e}")
             return None
     
+    @staticmethod
+    @_memoize
+    def generate_scatter(data, x_col, y_col, size_col=None, color_col=None, hover_col=None,
+                         title="Nuage de points", webgl_threshold=WEBGL_THRESHOLD,
+                         density_threshold=DENSITY_THRESHOLD):
+        """
+        Génère un nuage de points adapté au volume de données.
+        
+        Jusqu'à webgl_threshold points : tracé SVG classique. Au-delà :
+        tracé WebGL (Scattergl), fluide jusqu'à plusieurs centaines de
+        milliers de points ; les colonnes numériques sont transmises sous
+        forme de tableaux binaires (Plotly >= 6). Au-delà de
+        density_threshold : carte de densité (heatmap 2D), dont la taille
+        ne dépend plus du nombre de points.
+        """
+        try:
+            if len(data) > density_threshold:
+                fig = px.density_heatmap(
+                    data,
+                    x=x_col,
+                    y=y_col,
+                    nbinsx=200,
+                    nbinsy=200,
+                    title=f"{title} (densité, {len(data):,} points)"
+                )
+                return fig
+            
+            webgl = len(data) > webgl_threshold
+            fig = px.scatter(
+                data,
+                x=x_col,
+                y=y_col,
+                size=size_col,
+                color=color_col,
+                hover_name=hover_col,
+                title=title,
+                render_mode="webgl" if webgl else "svg"
+            )
+            if webgl:
+                # Contours et survol coûteux en WebGL sur de gros volumes
+                fig.update_traces(marker_line_width=0)
+                fig.update_layout(hovermode="closest")
+            return fig
+        except Exception as e:
+            print(f"❌ Erreur génération nuage de points: {e}")
+            return None
+    
+    @staticmethod
+    def figure_json(fig):
+        """JSON d'une figure, sans nouvelle sérialisation si elle vient du cache"""
+        cache = ChartGenerator.cache
+        return cache.to_json(fig) if cache is not None else fig.to_json()
+    
+    @staticmethod
+    def figure_image(fig, format="png"):
+        """Image d'une figure en octets, rendue une seule fois si elle vient du cache"""
+        cache = ChartGenerator.cache
+        return cache.to_image(fig, format) if cache is not None else pio.to_image(fig, format=format)
+    
     @staticmethod
     def save_chart(fig, filename="graphique.png"):
         """Sauvegarde un graphique en fichier"""
@@ -73,4 +423,84 @@ class ChartGenerator:
             return True
         except Exception as e:
             print(f"❌ Erreur sauvegarde graphique: {e}")
-            return False
\ No newline at end of file
+            return False
+    
+    @staticmethod
+    def export_charts(figures, output_dir="exports", formats=("png",), max_workers=None):
+        """
+        Exporte un lot de graphiques en images, en une seule passe de rendu.
+        
+        Chaque figure est identifiée par l'empreinte de son contenu : une
+        figure identique à une autre du lot est copiée au lieu d'être
+        rendue, et une image déjà exportée dans output_dir avec le même
+        contenu (voir .exports.json) n'est pas refaite.
+        
+        Args:
+            figures: {nom: figure} ou liste de figures (nommées graphique_1, ...)
+            output_dir: Dossier de destination
+            formats: Formats d'image parmi png, svg, pdf, jpeg, webp
+            max_workers: Processus de rendu si Plotly ne rend pas par lot
+                (défaut: MAX_WORKERS)
+            
+        Returns:
+            Dictionnaire avec paths, rendered, copied, skipped et seconds
+        """
+        start = time.perf_counter()
+        if not isinstance(figures, dict):
+            figures = {f"graphique_{i}": fig for i, fig in enumerate(figures, 1)}
+        unknown = [fmt for fmt in formats if fmt not in EXPORT_FORMATS]
+        if unknown:
+            raise ValueError(f"Format(s) non supporté(s): {', '.join(unknown)}")
+        os.makedirs(output_dir, exist_ok=True)
+        
+        manifest_path = os.path.join(output_dir, EXPORT_MANIFEST)
+        try:
+            with open(manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+        
+        jobs, copies, paths = [], [], []
+        rendered_by_hash = {}
+        skipped = 0
+        for name, fig in figures.items():
+            if fig is None:
+                continue
+            fig_json = ChartGenerator.figure_json(fig)
+            digest = hashlib.sha1(fig_json.encode("utf-8")).hexdigest()
+            for fmt in formats:
+                path = os.path.join(output_dir, f"{name}.{fmt}")
+                key = f"{digest}.{fmt}"
+                paths.append(path)
+                if manifest.get(os.path.basename(path)) == key and os.path.exists(path):
+                    rendered_by_hash.setdefault(key, path)
+                    skipped += 1
+                elif key in rendered_by_hash:
+                    copies.append((rendered_by_hash[key], path))
+                else:
+                    rendered_by_hash[key] = path
+                    jobs.append((fig_json, path))
+                manifest[os.path.basename(path)] = key
+        
+        try:
+            _render(jobs, max_workers=max_workers)
+            for source, path in copies:
+                shutil.copyfile(source, path)
+        except Exception as e:
+            print(f"❌ Erreur export graphiques: {e}")
+            return {"success": False, "error": str(e), "paths": []}
+        
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        
+        elapsed = time.perf_counter() - start
+        print(f"✅ {len(paths)} images exportées dans {output_dir} "
+              f"({len(jobs)} rendues, {len(copies)} copiées, {skipped} inchangées) en {elapsed:.1f}s")
+        return {
+            "success": True,
+            "paths": paths,
+            "rendered": len(jobs),
+            "copied": len(copies),
+            "skipped": skipped,
+            "seconds": elapsed,
+        }
@@ -0,0 +1,187 @@
+# modules/columnar_backend.py
+"""
+Moteur de stockage columnaire (Parquet partitionné) pour DatabaseConnector.
+
+Les ventes sont écrites dans des fichiers Parquet partitionnés par mois
+(style Hive : <racine>/month=AAAA-MM/part-*.parquet) et triés par
+(date, category). Les filtres sur la date éliminent d'abord les partitions,
+puis les groupes de lignes grâce aux statistiques min/max ; seules les
+colonnes utiles à l'agrégat sont lues.
+
+Nécessite pyarrow (dépendance optionnelle) :
+    pip install pyarrow
+"""
+
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    pa = None
+
+from modules.db_connector import SalesBackend, normalize_date
+
+SCHEMA = pa.schema([
+    ('date', pa.string()),
+    ('product', pa.string()),
+    ('quantity', pa.int64()),
+    ('revenue', pa.float64()),
+    ('category', pa.string()),
+]) if pa is not None else None
+
+PARTITIONING = ds.partitioning(
+    pa.schema([('month', pa.string())]), flavor='hive'
+) if pa is not None else None
+
+
+class ParquetBackend(SalesBackend):
+    def __init__(self, root_dir='sales_parquet'):
+        """
+        Moteur Parquet partitionné par mois
+
+        Args:
+            root_dir: Dossier racine du stockage (créé si besoin)
+        """
+        if pa is None:
+            raise ImportError(
+                "Le moteur 'parquet' nécessite pyarrow : pip install pyarrow"
+            )
+        self.root = Path(root_dir)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._write_lock = threading.Lock()
+
+    def insert(self, chunks):
+        """
+        Écrit les lots sous forme de fichiers Parquet.
+
+        Les fichiers sont d'abord écrits sous un nom caché (préfixe '.',
+        ignoré à la lecture) puis renommés une fois tous les lots écrits :
+        un import interrompu ne laisse aucune donnée visible.
+        """
+        total = 0
+        pending = []
+        with self._write_lock:
+            try:
+                for chunk in chunks:
+                    if not chunk:
+                        continue
+                    pending.extend(self._write_chunk(chunk))
+                    total += len(chunk)
+            except Exception:
+                for tmp, _ in pending:
+                    tmp.unlink(missing_ok=True)
+                raise
+            for tmp, final in pending:
+                os.replace(tmp, final)
+        return total
+
+    def _write_chunk(self, rows):
+        """Écrit un lot, un fichier par mois touché ; retourne (temporaire, final)"""
+        columns = list(zip(*rows))
+        # from_pandas : les cellules vides (NaN) deviennent des valeurs nulles
+        table = pa.Table.from_arrays(
+            [pa.array(col, type=field.type, from_pandas=True) for col, field in zip(columns, SCHEMA)],
+            schema=SCHEMA
+        )
+        months = pc.utf8_slice_codeunits(table['date'], 0, 7)
+        written = []
+        for month in pc.unique(months).to_pylist():
+            part = table.filter(pc.equal(months, month)) if month is not None else \
+                table.filter(pc.is_null(months))
+            # Le tri rend les statistiques min/max des groupes de lignes sélectives
+            part = part.sort_by([('date', 'ascending'), ('category', 'ascending')])
+            directory = self.root / f"month={month or '__HIVE_DEFAULT_PARTITION__'}"
+            directory.mkdir(exist_ok=True)
+            name = f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet"
+            tmp = directory / f".{name}"
+            pq.write_table(part, tmp, compression='zstd')
+            written.append((tmp, directory / name))
+        return written
+
+    def _dataset(self):
+        return ds.dataset(self.root, format='parquet', partitioning=PARTITIONING)
+
+    def _aggregate(self, key, start_date, end_date):
+        """SUM(quantity), SUM(revenue) GROUP BY key, lu lot par lot"""
+        columns = [key, 'quantity', 'revenue']
+        # Même forme que le résultat vide de pd.read_sql_query (moteur SQLite)
+        empty = pd.DataFrame(columns=[key, 'total_quantity', 'total_revenue'])
+
+        dataset = self._dataset()
+        if not dataset.files:
+            return empty
+
+        expr = None
+        if start_date and end_date:
+            start, end = normalize_date(start_date), normalize_date(end_date)
+            expr = (
+                (ds.field('month') >= start[:7]) & (ds.field('month') <= end[:7])
+                & (ds.field('date') >= start) & (ds.field('date') <= end)
+            )
+
+        # Agrégats partiels par lot puis fusion : la mémoire reste bornée.
+        # min_count=0 : des valeurs toutes vides somment à 0, comme les agrégats SQLite
+        total = pc.ScalarAggregateOptions(min_count=0)
+        partials = []
+        for batch in dataset.to_batches(columns=columns, filter=expr):
+            if batch.num_rows:
+                partials.append(
+                    pa.Table.from_batches([batch])
+                    .group_by(key)
+                    .aggregate([('quantity', 'sum', total), ('revenue', 'sum', total)])
+                )
+        if not partials:
+            return empty
+
+        result = (
+            pa.concat_tables(partials)
+            .group_by(key)
+            .aggregate([('quantity_sum', 'sum', total), ('revenue_sum', 'sum', total)])
+            .to_pandas()
+        )
+        return result.rename(columns={
+            'quantity_sum_sum': 'total_quantity',
+            'revenue_sum_sum': 'total_revenue',
+        })[[key, 'total_quantity', 'total_revenue']].sort_values(key, ignore_index=True, na_position='first')
+
+    def get_sales_data(self, start_date=None, end_date=None):
+        """Totaux par produit"""
+        return self._aggregate('product', start_date, end_date)
+
+    def get_category_data(self, start_date=None, end_date=None):
+        """Totaux par catégorie"""
+        return self._aggregate('category', start_date, end_date)
+
+    def compact(self):
+        """
+        Fusionne les fichiers de chaque mois en un seul fichier trié.
+
+        Chaque import crée de nouveaux fichiers ; à lancer périodiquement
+        (après le chargement nocturne par exemple) pour limiter leur nombre.
+        """
+        merged = 0
+        with self._write_lock:
+            for directory in sorted(self.root.glob('month=*')):
+                files = sorted(directory.glob('part-*.parquet'))
+                if len(files) < 2:
+                    continue
+                table = pa.concat_tables([pq.read_table(f, schema=SCHEMA) for f in files])
+                table = table.sort_by([('date', 'ascending'), ('category', 'ascending')])
+                name = f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet"
+                tmp = directory / f".{name}"
+                pq.write_table(table, tmp, compression='zstd')
+                os.replace(tmp, directory / name)
+                for f in files:
+                    f.unlink()
+                merged += len(files)
+        print(f"🗜️  Compaction terminée : {merged} fichiers fusionnés")
+        return merged
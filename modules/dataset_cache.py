@@ -0,0 +1,100 @@
+# modules/dataset_cache.py
+"""
+Cache partagé des jeux de données chargés depuis le disque.
+
+Un fichier n'est relu que si sa date de modification ou sa taille a changé ;
+les colonnes dérivées sont calculées une seule fois au chargement. Le
+nombre de jeux conservés est borné (éviction LRU).
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+
+class DatasetCache:
+    """Cache LRU de DataFrames invalidé par mtime/taille du fichier"""
+
+    def __init__(self, max_entries: int = 8):
+        """
+        Args:
+            max_entries: Nombre maximum de jeux de données gardés en mémoire
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Tuple[Tuple[int, int], pd.DataFrame]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def version(path: str) -> Tuple[int, int]:
+        """Empreinte du fichier : (mtime en ns, taille en octets)"""
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self, path: str, derive: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+            loader: Callable[[str], pd.DataFrame] = pd.read_csv) -> pd.DataFrame:
+        """
+        Retourne le DataFrame du fichier, depuis le cache si le fichier n'a pas changé.
+
+        Le DataFrame retourné est partagé entre les appelants : il ne doit
+        pas être modifié sur place (faire une copie si besoin).
+
+        Args:
+            path: Chemin du fichier
+            derive: Fonction ajoutant les colonnes dérivées, appelée au chargement
+            loader: Fonction de lecture (pd.read_csv par défaut)
+        """
+        key = (os.path.abspath(path), derive, loader)
+        version = self.version(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        df = loader(path)
+        if derive is not None:
+            df = derive(df)
+
+        with self._lock:
+            self._entries[key] = (version, df)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return df
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """Oublie un fichier (toutes ses variantes), ou tout le cache"""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                return
+            target = os.path.abspath(path)
+            for key in [k for k in self._entries if k[0] == target]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistiques d'utilisation du cache"""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+# Instance partagée par tout le processus
+dataset_cache = DatasetCache()
+
+
+def load_dataset(path: str, derive: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None) -> pd.DataFrame:
+    """Charge un CSV via le cache partagé"""
+    return dataset_cache.get(path, derive=derive)
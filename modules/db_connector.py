@@ -1,50 +1,563 @@
 # modules/db_connector.py
+import os
+import queue
 import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import date as date_type, datetime
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
 import pandas as pd
 
-class DatabaseConnector:
-    def __init__(self, db_path='business_data.db'):
-        """Initialise la connexion à la base de données"""
-        self.conn = sqlite3.connect(db_path)
-        self._create_tables()
+SALES_COLUMNS = ('date', 'product', 'quantity', 'revenue', 'category')
+DEFAULT_CHUNK_SIZE = 10000
+
+# Formats acceptés en entrée, la base ne stocke que du ISO 8601 (AAAA-MM-JJ)
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%Y/%m/%d', '%d-%m-%Y', '%d.%m.%Y')
+
+
+@lru_cache(maxsize=4096)
+def _normalize_date_str(value):
+    value = value.strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value[:10], fmt).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    raise ValueError(f"Date non reconnue: {value!r}")
+
+
+def normalize_date(value):
+    """
+    Convertit une date (str, date, datetime, Timestamp) au format AAAA-MM-JJ.
+
+    Le format ISO se trie comme la chronologie, ce qui permet aux index
+    de répondre aux requêtes BETWEEN par un simple parcours d'intervalle.
+    Les dates absentes (None, NaN, NaT) donnent None, stocké en NULL.
+    """
+    if value is None or (pd.api.types.is_scalar(value) and pd.isna(value)):
+        return None
+    if isinstance(value, (datetime, date_type)):
+        return value.strftime('%Y-%m-%d')
+    return _normalize_date_str(str(value))
+
+
+def _migration_v1(cursor):
+    """Table des ventes d'origine"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sales (
+            id INTEGER PRIMARY KEY,
+            date TEXT,
+            product TEXT,
+            quantity INTEGER,
+            revenue REAL,
+            category TEXT
+        )
+    ''')
+
+
+def _migration_v2(cursor):
+    """Dates normalisées en ISO 8601 et index couvrants"""
+    dates = [row[0] for row in cursor.execute("SELECT DISTINCT date FROM sales WHERE date IS NOT NULL")]
+    mapping, unparsed = [], []
+    for old in dates:
+        try:
+            new = normalize_date(old)
+        except ValueError:
+            # Une date illisible ne doit pas bloquer l'ouverture de la base : on la garde telle quelle
+            unparsed.append(old)
+            continue
+        if new != old:
+            mapping.append((old, new))
+    if mapping:
+        # Une seule passe sur la table (un UPDATE par date la parcourrait à chaque fois)
+        cursor.execute("CREATE TEMP TABLE date_map (old TEXT PRIMARY KEY, new TEXT)")
+        cursor.executemany("INSERT INTO date_map VALUES (?, ?)", mapping)
+        cursor.execute(
+            "UPDATE sales SET date = (SELECT new FROM date_map WHERE old = sales.date) "
+            "WHERE date IN (SELECT old FROM date_map)"
+        )
+        cursor.execute("DROP TABLE date_map")
+    if unparsed:
+        print(f"⚠️ {len(unparsed)} date(s) non reconnue(s) laissée(s) telle(s) quelle(s): "
+              f"{', '.join(repr(d) for d in unparsed[:5])}{'...' if len(unparsed) > 5 else ''}")
+    # (date, product, quantity, revenue) couvre get_sales_data sans lire la table
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_sales_date_product "
+        "ON sales (date, product, quantity, revenue)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_sales_category_date "
+        "ON sales (category, date, quantity, revenue)"
+    )
+
+
+def _migration_v3(cursor):
+    """Tables d'agrégats journaliers jour×produit et jour×catégorie"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS daily_product_sales (
+            date TEXT,
+            product TEXT,
+            quantity INTEGER NOT NULL DEFAULT 0,
+            revenue REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (date, product)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS daily_category_sales (
+            date TEXT,
+            category TEXT,
+            quantity INTEGER NOT NULL DEFAULT 0,
+            revenue REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (date, category)
+        )
+    ''')
+    _rebuild_rollups(cursor)
+
+
+def _rebuild_rollups(cursor):
+    """Recalcule entièrement les agrégats à partir de la table sales"""
+    cursor.execute("DELETE FROM daily_product_sales")
+    cursor.execute("DELETE FROM daily_category_sales")
+    cursor.execute('''
+        INSERT INTO daily_product_sales (date, product, quantity, revenue)
+        SELECT date, product, COALESCE(SUM(quantity), 0), COALESCE(SUM(revenue), 0)
+        FROM sales GROUP BY date, product
+    ''')
+    cursor.execute('''
+        INSERT INTO daily_category_sales (date, category, quantity, revenue)
+        SELECT date, category, COALESCE(SUM(quantity), 0), COALESCE(SUM(revenue), 0)
+        FROM sales GROUP BY date, category
+    ''')
+
+
+def _is_missing(value):
+    """None ou NaN (cellule vide d'un DataFrame / CSV)"""
+    return value is None or (isinstance(value, float) and value != value)
+
+
+def _aggregate_rows(rows, key_index):
+    """
+    Agrège (date, clé) -> [quantité, CA] pour un lot de lignes de vente.
+
+    Une quantité ou un CA absent compte pour 0 (les colonnes d'agrégats
+    sont NOT NULL) ; une clé absente est regroupée sous NULL.
+    """
+    totals = {}
+    for row in rows:
+        key = (row[0], None if _is_missing(row[key_index]) else row[key_index])
+        entry = totals.get(key)
+        if entry is None:
+            entry = totals[key] = [0, 0.0]
+        if not _is_missing(row[2]):
+            entry[0] += row[2]
+        if not _is_missing(row[3]):
+            entry[1] += row[3]
+    return [(d, k, q, r) for (d, k), (q, r) in totals.items()]
+
+
+# Chaque entrée (version, migration) est appliquée une seule fois, dans l'ordre
+MIGRATIONS = [
+    (1, _migration_v1),
+    (2, _migration_v2),
+    (3, _migration_v3),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def _default_pool_size():
+    """Taille du pool de lecture, alignée sur MAX_WORKERS (.env)"""
+    try:
+        return max(1, int(os.getenv("MAX_WORKERS", "4")))
+    except ValueError:
+        return 4
+
+
+class ConnectionPool:
+    """
+    Pool borné de connexions SQLite en lecture seule.
+
+    Les connexions sont ouvertes à la demande jusqu'à `size`, puis
+    réutilisées : un thread Streamlit emprunte une connexion le temps d'une
+    requête au lieu d'en ouvrir une à chaque réexécution du script.
+    """
+    
+    def __init__(self, db_path, size):
+        self.uri = f"{Path(db_path).resolve().as_uri()}?mode=ro"
+        self.size = size
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._created = 0
+        self._lock = threading.Lock()
+    
+    def _open(self):
+        return sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+    
+    @contextmanager
+    def connection(self):
+        """Emprunte une connexion (bloque si toutes sont occupées)"""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._lock:
+                if self._created < self.size:
+                    self._created += 1
+                    create = True
+                else:
+                    create = False
+            if create:
+                try:
+                    conn = self._open()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+    
+    def close(self):
+        """Ferme les connexions inactives du pool"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._created = 0
+
+
+class SalesBackend(ABC):
+    """
+    Interface d'un moteur de stockage des ventes.
+
+    DatabaseConnector normalise les lignes (date ISO, colonnes dans l'ordre
+    de SALES_COLUMNS) et les découpe en lots ; le moteur n'a qu'à les
+    écrire et à calculer les agrégats.
+    """
     
-    def _create_tables(self):
-        """Crée les tables si elles n'existent pas"""
+    @abstractmethod
+    def insert(self, chunks):
+        """Écrit les lots de tuples en une seule transaction, retourne le nombre de lignes"""
+    
+    @abstractmethod
+    def get_sales_data(self, start_date=None, end_date=None):
+        """Totaux par produit : DataFrame (product, total_quantity, total_revenue)"""
+    
+    @abstractmethod
+    def get_category_data(self, start_date=None, end_date=None):
+        """Totaux par catégorie : DataFrame (category, total_quantity, total_revenue)"""
+    
+    def close(self):
+        """Libère les ressources du moteur"""
+
+
+class SQLiteBackend(SalesBackend):
+    def __init__(self, db_path='business_data.db', wal=False, pool_size=None):
+        """
+        Moteur SQLite (stockage par lignes)
+
+        Les écritures passent par une connexion unique protégée par un verrou,
+        les lectures par un pool de connexions en lecture seule. L'instance
+        peut donc être partagée entre les threads (voir get_connector).
+
+        Args:
+            db_path: Chemin du fichier SQLite
+            wal: Active le journal WAL et synchronous=NORMAL (imports massifs,
+                lectures concurrentes non bloquées par l'écrivain)
+            pool_size: Nombre max de connexions de lecture (défaut: MAX_WORKERS)
+        """
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._write_lock = threading.RLock()
+        if wal:
+            self.enable_wal()
+        self._migrate()
+        
+        # Une base en mémoire n'est visible que par sa propre connexion
+        if db_path == ':memory:':
+            self._pool = None
+        else:
+            self._pool = ConnectionPool(db_path, pool_size or _default_pool_size())
+    
+    @contextmanager
+    def _read_connection(self):
+        """Connexion de lecture : empruntée au pool, ou l'écrivain à défaut"""
+        if self._pool is None:
+            with self._write_lock:
+                yield self.conn
+        else:
+            with self._pool.connection() as conn:
+                yield conn
+    
+    def _migrate(self):
+        """
+        Met le schéma à jour en appliquant les migrations manquantes.
+
+        La version courante est lue dans PRAGMA user_version, ce qui permet
+        de mettre à niveau sur place un business_data.db existant.
+        """
         cursor = self.conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS sales (
-                id INTEGER PRIMARY KEY,
-                date TEXT,
-                product TEXT,
-                quantity INTEGER,
-                revenue REAL,
-                category TEXT
-            )
-        ''')
-        self.conn.commit()
+        current = cursor.execute("PRAGMA user_version").fetchone()[0]
+        existing = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sales'"
+        ).fetchone() is not None
+        for version, migration in MIGRATIONS:
+            if version <= current:
+                continue
+            try:
+                migration(cursor)
+                cursor.execute(f"PRAGMA user_version = {version}")
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+            if existing:
+                print(f"🔧 Migration du schéma vers la version {version}")
+    
+    def schema_version(self):
+        """Retourne la version du schéma de la base"""
+        with self._read_connection() as conn:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
+    
+    def enable_wal(self):
+        """
+        Passe la base en mode WAL avec synchronous=NORMAL.
+
+        Un seul fsync par checkpoint au lieu d'un par transaction : adapté
+        aux chargements nocturnes, au prix des dernières transactions en cas
+        de coupure de courant (la base reste cohérente).
+        """
+        with self._write_lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
     
     def get_sales_data(self, start_date=None, end_date=None):
-        """Récupère les données de vente"""
-        query = "SELECT product, SUM(quantity) as total_quantity, SUM(revenue) as total_revenue FROM sales"
+        """
+        Récupère les données de vente
+
+        Les totaux sont lus dans l'agrégat jour×produit : le coût dépend du
+        nombre de jours×produits de la période, pas du nombre de ventes.
+        """
+        query = "SELECT product, SUM(quantity) as total_quantity, SUM(revenue) as total_revenue FROM daily_product_sales"
         
         params = []
         if start_date and end_date:
             query += " WHERE date BETWEEN ? AND ?"
-            params = [start_date, end_date]
+            params = [normalize_date(start_date), normalize_date(end_date)]
         
         query += " GROUP BY product"
         
-        return pd.read_sql_query(query, self.conn, params=params)
+        with self._read_connection() as conn:
+            return pd.read_sql_query(query, conn, params=params)
+    
+    def get_category_data(self, start_date=None, end_date=None):
+        """Récupère les totaux par catégorie (agrégat jour×catégorie)"""
+        query = "SELECT category, SUM(quantity) as total_quantity, SUM(revenue) as total_revenue FROM daily_category_sales"
+        
+        params = []
+        if start_date and end_date:
+            query += " WHERE date BETWEEN ? AND ?"
+            params = [normalize_date(start_date), normalize_date(end_date)]
+        
+        query += " GROUP BY category"
+        
+        with self._read_connection() as conn:
+            return pd.read_sql_query(query, conn, params=params)
+    
+    def rebuild_rollups(self):
+        """Recalcule les agrégats (après une écriture directe dans sales)"""
+        with self._write_lock:
+            cursor = self.conn.cursor()
+            try:
+                _rebuild_rollups(cursor)
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+    
+    def _insert_rows(self, cursor, rows):
+        """Insère un lot de ventes et met à jour les agrégats dans la même transaction"""
+        cursor.executemany(
+            "INSERT INTO sales (date, product, quantity, revenue, category) VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+        cursor.executemany(
+            "INSERT INTO daily_product_sales (date, product, quantity, revenue) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (date, product) DO UPDATE SET "
+            "quantity = quantity + excluded.quantity, revenue = revenue + excluded.revenue",
+            _aggregate_rows(rows, 1)
+        )
+        cursor.executemany(
+            "INSERT INTO daily_category_sales (date, category, quantity, revenue) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (date, category) DO UPDATE SET "
+            "quantity = quantity + excluded.quantity, revenue = revenue + excluded.revenue",
+            _aggregate_rows(rows, 4)
+        )
+    
+    def insert(self, chunks):
+        """Insère tous les lots dans une seule transaction"""
+        total = 0
+        with self._write_lock:
+            cursor = self.conn.cursor()
+            try:
+                for chunk in chunks:
+                    self._insert_rows(cursor, chunk)
+                    total += len(chunk)
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+        return total
+    
+    def close(self):
+        """Ferme la connexion"""
+        if self._pool is not None:
+            self._pool.close()
+        with self._write_lock:
+            self.conn.close()
+
+
+BACKENDS = {
+    'sqlite': SQLiteBackend,
+}
+
+
+def _load_backend(name):
+    """Résout un nom de moteur ; le moteur columnaire n'est importé qu'à la demande"""
+    if name == 'parquet':
+        from modules.columnar_backend import ParquetBackend
+        return ParquetBackend
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Moteur de stockage inconnu: {name!r}") from None
+
+
+class DatabaseConnector:
+    def __init__(self, db_path='business_data.db', wal=False, pool_size=None, backend=None):
+        """
+        Initialise la connexion à la base de données
+
+        Args:
+            db_path: Chemin du fichier SQLite, ou dossier du stockage Parquet
+            wal: Active le journal WAL et synchronous=NORMAL (SQLite)
+            pool_size: Nombre max de connexions de lecture (SQLite, défaut: MAX_WORKERS)
+            backend: 'sqlite', 'parquet' ou une instance de SalesBackend
+                (défaut: variable DB_TYPE, sinon 'sqlite')
+        """
+        if isinstance(backend, SalesBackend):
+            self.backend = backend
+            return
+        backend_cls = _load_backend((backend or os.getenv("DB_TYPE") or 'sqlite').lower())
+        if backend_cls is SQLiteBackend:
+            self.backend = SQLiteBackend(db_path, wal=wal, pool_size=pool_size)
+        else:
+            self.backend = backend_cls(db_path)
+    
+    def __getattr__(self, name):
+        # Fonctions propres au moteur : conn, enable_wal, rebuild_rollups, compact...
+        if name == 'backend':
+            raise AttributeError(name)
+        return getattr(self.backend, name)
+    
+    def get_sales_data(self, start_date=None, end_date=None):
+        """Récupère les données de vente"""
+        return self.backend.get_sales_data(start_date, end_date)
+    
+    def get_category_data(self, start_date=None, end_date=None):
+        """Récupère les totaux par catégorie"""
+        return self.backend.get_category_data(start_date, end_date)
     
     def add_sale(self, date, product, quantity, revenue, category):
         """Ajoute une vente à la base"""
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "INSERT INTO sales (date, product, quantity, revenue, category) VALUES (?, ?, ?, ?, ?)",
-            (date, product, quantity, revenue, category)
+        self.backend.insert([[(normalize_date(date), product, quantity, revenue, category)]])
+    
+    def add_sales(self, sales, chunk_size=DEFAULT_CHUNK_SIZE, verbose=True):
+        """
+        Ajoute un lot de ventes en une seule transaction.
+
+        Args:
+            sales: DataFrame, chemin d'un fichier CSV, ou itérable de tuples
+                (date, product, quantity, revenue, category) / de dicts
+            chunk_size: Nombre de lignes écrites par lot
+            verbose: Affiche le débit obtenu
+
+        Returns:
+            Dictionnaire {rows, seconds, rows_per_sec}
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size doit être >= 1")
+        
+        start = time.perf_counter()
+        total = self.backend.insert(self._iter_sales_chunks(sales, chunk_size))
+        
+        elapsed = time.perf_counter() - start
+        stats = {
+            "rows": total,
+            "seconds": elapsed,
+            "rows_per_sec": total / elapsed if elapsed > 0 else float(total)
+        }
+        if verbose:
+            print(f"✅ {total} ventes importées en {elapsed:.2f}s ({stats['rows_per_sec']:,.0f} lignes/s)")
+        return stats
+    
+    @staticmethod
+    def _iter_sales_chunks(sales, chunk_size):
+        """Découpe la source de ventes en listes de tuples de taille chunk_size"""
+        if isinstance(sales, pd.DataFrame):
+            frames = (sales.iloc[i:i + chunk_size] for i in range(0, len(sales), chunk_size))
+        elif isinstance(sales, str) or hasattr(sales, '__fspath__'):
+            frames = pd.read_csv(sales, chunksize=chunk_size)
+        else:
+            frames = None
+        
+        if frames is not None:
+            for frame in frames:
+                frame = frame[list(SALES_COLUMNS)].copy()
+                frame['date'] = frame['date'].map(normalize_date)
+                # itertuples évite la création d'une Series par ligne
+                yield list(frame.itertuples(index=False, name=None))
+            return
+        
+        rows = (
+            (normalize_date(row[0]),) + tuple(row[1:])
+            for row in (
+                tuple(row[col] for col in SALES_COLUMNS) if isinstance(row, dict) else tuple(row)
+                for row in sales
+            )
         )
-        self.conn.commit()
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            yield chunk
     
     def close(self):
         """Ferme la connexion"""
-        self.conn.close()
\ No newline at end of file
+        self.backend.close()
+
+
+_shared_connectors = {}
+_shared_lock = threading.Lock()
+
+
+def get_connector(db_path='business_data.db', **kwargs):
+    """
+    Retourne un DatabaseConnector partagé par tout le processus pour db_path.
+
+    Évite d'ouvrir (et de migrer) une base à chaque session ou réexécution
+    Streamlit : tous les threads réutilisent le même écrivain et le même pool.
+    """
+    key = db_path if db_path == ':memory:' else str(Path(db_path).resolve())
+    with _shared_lock:
+        connector = _shared_connectors.get(key)
+        if connector is None:
+            connector = _shared_connectors[key] = DatabaseConnector(db_path, **kwargs)
+        return connector
@@ -4,24 +4,484 @@ Gestionnaire de mémoire simple pour DataBot.
 Ne dépend d'aucune bibliothèque externe.
 """
 
+import heapq
 import json
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import deque
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from itertools import islice
+from typing import Callable, Iterator, List, Dict, Any, Optional
+
+# Morceaux de 4 lettres au plus et signes de ponctuation : approximation
+# des jetons BPE (≈ 1 jeton pour 3-4 caractères en français)
+_TOKEN_RE = re.compile(r"\w{1,4}|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimation du nombre de jetons d'un texte, sans tokenizer externe"""
+    return len(_TOKEN_RE.findall(text))
+
+
+def _abridge(text: str, max_words: int) -> str:
+    """Premiers mots d'un texte, sur une seule ligne"""
+    words = text.split()
+    if len(words) <= max_words:
+        return " ".join(words)
+    return " ".join(words[:max_words]) + "…"
+
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Décalage horloge murale / horloge monotone, fixé au chargement du module :
+# les messages stockent time.monotonic() et la date n'est calculée qu'à l'affichage
+_WALL_OFFSET = time.time() - time.monotonic()
+
+
+class Message:
+    """
+    Message de l'historique (enregistrement compact, sans __dict__).
+    
+    Accessible comme un dictionnaire (msg['role'], msg['content'],
+    msg['timestamp']) pour rester compatible avec l'ancien format.
+    """
+    
+    __slots__ = ("role", "content", "created")
+    
+    def __init__(self, role: str, content: str, created: Optional[float] = None):
+        self.role = role
+        self.content = content
+        self.created = time.monotonic() if created is None else created
+    
+    @property
+    def timestamp(self) -> str:
+        """Date du message, formatée à la demande"""
+        return datetime.fromtimestamp(self.created + _WALL_OFFSET).strftime(TIMESTAMP_FORMAT)
+    
+    def __getitem__(self, key: str) -> Any:
+        if key in ("role", "content", "timestamp"):
+            return getattr(self, key)
+        raise KeyError(key)
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+    
+    def to_dict(self) -> Dict[str, str]:
+        return {"role": self.role, "content": self.content, "timestamp": self.timestamp}
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Message":
+        """Reconstruit un message sauvegardé (date murale -> horloge monotone)"""
+        created = None
+        if data.get("timestamp"):
+            try:
+                wall = datetime.strptime(data["timestamp"], TIMESTAMP_FORMAT).timestamp()
+                created = wall - _WALL_OFFSET
+            except ValueError:
+                pass
+        role = "ai" if data.get("role") == "ai" else "human"
+        return cls(role, str(data.get("content", "")), created)
+    
+    def __repr__(self) -> str:
+        return f"Message({self.role!r}, {self.content[:30]!r})"
+
+
+_WORD_RE = re.compile(r"\w+")
+
+# Mots trop fréquents pour discriminer (après suppression des accents)
+STOP_WORDS = frozenset(
+    "a au aux avec ce ces dans de des du elle en est et il ils je l la le les leur lui "
+    "ma mais me mes mon ne nos notre nous on ou par pas pour qu que qui sa se ses son "
+    "sur ta te tes ton tu un une vos votre vous y d j m n s t".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Mots en minuscules et sans accents ("Écran" -> "ecran"), mots vides exclus"""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return [word for word in _WORD_RE.findall(text) if word not in STOP_WORDS]
+
+
+class SearchIndex:
+    """
+    Index inversé des messages, mis à jour à chaque ajout.
+    
+    Les résultats sont classés par score BM25. Au-delà de `capacity`
+    messages, les plus anciens sortent de l'index (coût proportionnel à
+    leur nombre de mots).
+    """
+    
+    K1 = 1.2
+    B = 0.75
+    
+    def __init__(self, capacity: Optional[int] = None):
+        """
+        Args:
+            capacity: Nombre maximum de messages indexés (None: illimité)
+        """
+        self.capacity = capacity
+        self.clear()
+    
+    def clear(self) -> None:
+        self._postings: Dict[str, Dict[int, int]] = {}   # mot -> {id: occurrences}
+        self._docs: Dict[int, Message] = {}
+        self._lengths: Dict[int, int] = {}
+        self._order: deque = deque()
+        self._next_id = 0
+        self._total_length = 0
+        self.chars = 0      # caractères des messages indexés
+    
+    def __len__(self) -> int:
+        return len(self._docs)
+    
+    def add(self, message: Message) -> int:
+        """Indexe un message et retourne son identifiant"""
+        doc_id = self._next_id
+        self._next_id += 1
+        terms = tokenize(message.content)
+        for term in terms:
+            postings = self._postings.setdefault(term, {})
+            postings[doc_id] = postings.get(doc_id, 0) + 1
+        self._docs[doc_id] = message
+        self._lengths[doc_id] = len(terms)
+        self._total_length += len(terms)
+        self.chars += len(message.content)
+        self._order.append(doc_id)
+        
+        while self.capacity is not None and len(self._order) > self.capacity:
+            self.remove(self._order.popleft())
+        return doc_id
+    
+    def remove(self, doc_id: int) -> None:
+        """Retire un message de l'index"""
+        message = self._docs.pop(doc_id, None)
+        if message is None:
+            return
+        for term in set(tokenize(message.content)):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._lengths.pop(doc_id)
+        self.chars -= len(message.content)
+    
+    def search(self, query: str, limit: Optional[int] = None) -> List[Message]:
+        """
+        Messages correspondant à la requête, du plus pertinent au moins pertinent.
+        
+        Les messages contenant tous les mots de la requête sont retenus ;
+        s'il n'y en a aucun, ceux qui en contiennent au moins un. À score
+        égal, le plus récent passe en premier.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        postings = sorted((self._postings[t] for t in terms if t in self._postings), key=len)
+        if not postings:
+            return []
+        
+        # Intersection en partant de la liste la plus courte
+        candidates = set(postings[0])
+        for other in postings[1:]:
+            candidates.intersection_update(other)
+            if not candidates:
+                break
+        if not candidates or len(postings) < len(terms):
+            candidates = set().union(*postings)
+        
+        count = len(self._docs)
+        avg_length = self._total_length / count if count else 1.0
+        idf = [math.log(1 + (count - len(p) + 0.5) / (len(p) + 0.5)) for p in postings]
+        
+        def score(doc_id: int) -> float:
+            norm = self.K1 * (1 - self.B + self.B * self._lengths[doc_id] / (avg_length or 1.0))
+            total = 0.0
+            for weight, p in zip(idf, postings):
+                tf = p.get(doc_id)
+                if tf:
+                    total += weight * tf * (self.K1 + 1) / (tf + norm)
+            return total
+        
+        ranked = ((score(doc_id), doc_id) for doc_id in candidates)
+        if limit is None:
+            best = sorted(ranked, reverse=True)
+        else:
+            best = heapq.nlargest(limit, ranked)
+        return [self._docs[doc_id] for _, doc_id in best]
+
+
+class MemoryJournal:
+    """
+    Journal des messages en ajout seul (JSON Lines).
+    
+    Chaque message ajoute une ligne : le coût ne dépend pas de la taille de
+    l'historique. Les écritures sont synchronisées sur disque (fsync) par
+    lots, toutes les `fsync_every` lignes ou, au premier ajout qui suit,
+    `fsync_interval` secondes après la précédente synchronisation (il n'y a
+    pas de minuterie : sync() ou close() écrivent les lignes en attente) ;
+    en cas d'arrêt brutal seul le dernier lot peut être perdu, une ligne
+    tronquée étant ignorée à la relecture. Le journal est compacté (seules
+    les `keep` dernières lignes sont gardées, réécriture atomique) quand il
+    atteint 2 × keep lignes, y compris d'une exécution à l'autre : sa
+    taille reste bornée à environ 2 × keep lignes.
+    """
+    
+    BLOCK_SIZE = 64 * 1024
+    
+    def __init__(self, path: str, keep: Optional[int] = None, fsync_every: int = 32,
+                 fsync_interval: float = 1.0):
+        """
+        Args:
+            path: Fichier .jsonl du journal
+            keep: Nombre de lignes gardées à la compaction (None: jamais compacté)
+            fsync_every: Nombre de lignes par synchronisation disque
+            fsync_interval: Délai maximum (secondes) entre deux synchronisations
+        """
+        self.path = path
+        self.keep = keep
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        if self._file.tell() > 0:
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self._file.write("\n")   # termine une ligne tronquée
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        # Lignes au-delà de keep déjà présentes (exécutions précédentes)
+        self._since_compaction = 0
+        if keep is not None and self._file.tell() > 0:
+            self._since_compaction = max(0, self._count_lines() - keep)
+            if self._since_compaction >= max(keep, 1):
+                self._compact(keep)
+    
+    def _count_lines(self) -> int:
+        self._file.flush()
+        count = 0
+        with open(self.path, "rb") as f:
+            for block in iter(lambda: f.read(self.BLOCK_SIZE), b""):
+                count += block.count(b"\n")
+        return count
+    
+    def append(self, record: Dict[str, Any]) -> None:
+        """Ajoute un enregistrement en fin de journal"""
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._pending += 1
+            self._since_compaction += 1
+            if (self._pending >= self.fsync_every
+                    or time.monotonic() - self._last_sync >= self.fsync_interval):
+                self._sync()
+            if self.keep is not None and self._since_compaction >= max(self.keep, 1):
+                self._compact(self.keep)
+    
+    def _sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+    
+    def sync(self) -> None:
+        """Force l'écriture sur disque des lignes en attente"""
+        with self._lock:
+            self._sync()
+    
+    def tail(self, n: Optional[int]) -> List[Dict[str, Any]]:
+        """Les n derniers enregistrements (tous si n est None)"""
+        with self._lock:
+            self._file.flush()
+            return read_journal_tail(self.path, n)
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Parcourt le journal du début à la fin, ligne par ligne"""
+        with self._lock:
+            self._file.flush()
+        return iter_journal(self.path)
+    
+    def _compact(self, keep: int) -> None:
+        self._file.flush()
+        lines = _read_tail_lines(self.path, keep) if keep else []
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.writelines(line + b"\n" for line in lines)
+            f.flush()
+            os.fsync(f.fileno())
+        self._file.close()
+        os.replace(tmp_path, self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._pending = 0
+        self._since_compaction = 0
+        self._last_sync = time.monotonic()
+    
+    def compact(self, keep: Optional[int] = None) -> None:
+        """Réécrit le journal avec ses `keep` dernières lignes (défaut: self.keep)"""
+        keep = self.keep if keep is None else keep
+        if keep is None:
+            return
+        with self._lock:
+            self._compact(keep)
+    
+    def truncate(self) -> None:
+        """Vide le journal"""
+        with self._lock:
+            self._compact(0)
+    
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._sync()
+                self._file.close()
+
+
+def _read_tail_lines(path: str, n: Optional[int]) -> List[bytes]:
+    """Dernières lignes non vides d'un fichier, lu par blocs depuis la fin"""
+    with open(path, "rb") as f:
+        if n is None:
+            return [line for line in f.read().splitlines() if line.strip()]
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b""
+        while position > 0 and data.count(b"\n") <= n:
+            step = min(MemoryJournal.BLOCK_SIZE, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+    lines = [line for line in data.splitlines() if line.strip()]
+    if position > 0:
+        lines = lines[1:]   # première ligne peut-être incomplète
+    return lines[-n:] if n else []
+
+
+def _decode(lines: List[bytes]) -> List[Dict[str, Any]]:
+    records = []
+    for line in lines:
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue    # ligne tronquée par un arrêt brutal
+    return records
+
+
+def read_journal_tail(path: str, n: Optional[int]) -> List[Dict[str, Any]]:
+    """Les n derniers enregistrements d'un journal, sans lire tout le fichier"""
+    return _decode(_read_tail_lines(path, n))
+
+
+def iter_journal(path: str) -> Iterator[Dict[str, Any]]:
+    """Enregistrements d'un journal, du plus ancien au plus récent (mémoire constante)"""
+    with open(path, "rb") as f:
+        for line in f:
+            yield from _decode([line])
+
 
 class MemoryManager:
     """Gestionnaire de mémoire ultra-simple pour DataBot"""
     
-    def __init__(self, max_messages: int = 20):
+    def __init__(self, max_messages: int = 20, context_tokens: int = 500, digest_tokens: int = 150,
+                 token_counter: Optional[Callable[[str], int]] = None, archive_size: Optional[int] = None,
+                 journal_path: Optional[str] = None):
         """
         Initialise le gestionnaire de mémoire.
         
         Args:
             max_messages: Nombre maximum de messages à conserver
+            context_tokens: Budget en jetons du contexte envoyé à l'IA (résumé compris)
+            digest_tokens: Part du budget réservée au résumé des anciens échanges
+            token_counter: Fonction de comptage des jetons (défaut: estimate_tokens),
+                par exemple le tokenizer du modèle
+            archive_size: Nombre de messages consultables par search, y compris
+                ceux déjà sortis de l'historique (défaut: max_messages, soit
+                l'historique seul ; une archive plus grande est à demander)
+            journal_path: Journal .jsonl où chaque message est persisté à l'ajout ;
+                s'il existe, ses derniers messages sont rechargés
         """
-        self.history: List[Dict[str, Any]] = []
+        if max_messages < 1:
+            raise ValueError("max_messages doit être >= 1")
+        if archive_size is None:
+            archive_size = max_messages
+        
+        # Tampon circulaire : ajout et éviction du plus ancien en O(1)
+        self.history: "deque[Message]" = deque(maxlen=max_messages)
         self.max_messages = max_messages
+        self._role_counts = {"human": 0, "ai": 0}
+        self.index = SearchIndex(capacity=archive_size)
+        self.context_tokens = context_tokens
+        self.digest_tokens = min(digest_tokens, context_tokens)
+        self.count_tokens = token_counter or estimate_tokens
+        self._reset_context()
+        
+        self.journal: Optional[MemoryJournal] = None
+        self._archive_pending = False
+        if journal_path:
+            exists = os.path.exists(journal_path)
+            self.journal = MemoryJournal(journal_path, keep=max(archive_size, max_messages))
+            if exists:
+                self._restore(self.journal.tail(max_messages))
+                # Les messages plus anciens ne sont indexés qu'à la première recherche
+                self._archive_pending = True
         print(f"🧠 MemoryManager initialisé (max: {max_messages} messages)")
     
+    def _reset_context(self) -> None:
+        """Vide la fenêtre de contexte et le résumé"""
+        self._turns: deque = deque()    # (question, réponse, texte, jetons) récents
+        self._turn_tokens = 0
+        self._digest: deque = deque()   # (ligne, jetons) des échanges résumés
+        self._digest_used = 0
+        self._pending_question: Optional[str] = None
+        self._context: Optional[str] = None
+    
+    def _track(self, role: str, content: str) -> None:
+        """Associe chaque réponse à la question qui la précède"""
+        if role == 'human':
+            self._pending_question = content
+        elif self._pending_question is not None:
+            self._push_turn(self._pending_question, content)
+            self._pending_question = None
+    
+    def _push_turn(self, question: str, answer: str) -> None:
+        """
+        Ajoute un échange à la fenêtre de contexte.
+        
+        Les échanges qui sortent du budget passent dans le résumé (une ligne
+        abrégée chacun), dont les lignes les plus anciennes sont oubliées à
+        leur tour. Chaque échange entre et sort une seule fois : coût O(1)
+        amorti par ajout.
+        """
+        window = self.context_tokens - self.digest_tokens
+        text = f"User: {question}\nAssistant: {answer}\n---\n"
+        tokens = self.count_tokens(text)
+        if tokens > window:
+            # Un échange seul plus long que la fenêtre est tronqué
+            text = text[:max(1, len(text) * window // tokens)].rstrip() + "…\n---\n"
+            tokens = self.count_tokens(text)
+        
+        self._turns.append((question, answer, text, tokens))
+        self._turn_tokens += tokens
+        
+        while self._turn_tokens > window and len(self._turns) > 1:
+            old_question, old_answer, _, old_tokens = self._turns.popleft()
+            self._turn_tokens -= old_tokens
+            line = f"- {_abridge(old_question, 12)} → {_abridge(old_answer, 20)}\n"
+            line_tokens = self.count_tokens(line)
+            self._digest.append((line, line_tokens))
+            self._digest_used += line_tokens
+            while self._digest_used > self.digest_tokens and self._digest:
+                self._digest_used -= self._digest.popleft()[1]
+        
+        self._context = None
+    
     def add_message(self, role: str, content: str) -> None:
         """
         Ajoute un message à l'historique.
@@ -33,17 +493,18 @@ class MemoryManager:
         if role not in ['human', 'ai']:
             role = 'human'  # Valeur par défaut
         
-        message = {
-            "role": role,
-            "content": str(content),
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
+        message = Message(role, str(content))
         
+        # Le tampon plein évince le plus ancien message
+        if len(self.history) == self.max_messages:
+            self._role_counts[self.history[0].role] -= 1
         self.history.append(message)
+        self._role_counts[role] += 1
+        self.index.add(message)
+        self._track(role, message.content)
         
-        # Limite la taille de l'historique
-        if len(self.history) > self.max_messages:
-            self.history = self.history[-self.max_messages:]
+        if self.journal is not None:
+            self.journal.append(message.to_dict())
     
     def add_conversation(self, question: str, answer: str) -> None:
         """
@@ -71,7 +532,7 @@ class MemoryManager:
             return "Aucun historique disponible."
         
         # Prend les derniers messages (2 par conversation)
-        recent = self.history[-(n*2):] if len(self.history) >= n*2 else self.history
+        recent = list(islice(self.history, max(0, len(self.history) - n*2), None))
         
         result = "📋 **HISTORIQUE RÉCENT:**\n"
         result += "-" * 40 + "\n"
@@ -95,73 +556,117 @@ class MemoryManager:
         
         return result
     
-    def get_context_for_ai(self, max_length: int = 500) -> str:
+    def get_context_for_ai(self, max_tokens: Optional[int] = None) -> str:
         """
         Génère un contexte pour l'agent IA.
         
+        Le contexte contient le résumé des anciens échanges puis les
+        derniers échanges complets. Il est maintenu au fil des ajouts et
+        n'est reconstruit qu'après un changement.
+        
         Args:
-            max_length: Longueur maximale du contexte
+            max_tokens: Budget en jetons (défaut et plafond: context_tokens)
             
         Returns:
             Contexte formaté pour l'IA
         """
-        if not self.history:
+        if not self._turns and not self._digest:
             return ""
         
-        context = "CONTEXTE PRÉCÉDENT:\n"
-        
-        # Compte les caractères
-        char_count = len(context)
-        
-        # Ajoute les conversations récentes (plus récentes d'abord)
-        for i in range(len(self.history)-1, -1, -2):
-            if i-1 >= 0:
-                q = self.history[i-1] if self.history[i-1]['role'] == 'human' else None
-                a = self.history[i] if self.history[i]['role'] == 'ai' else None
-                
-                if q and a:
-                    conv_text = f"User: {q['content']}\nAssistant: {a['content']}\n---\n"
-                    
-                    if char_count + len(conv_text) > max_length:
-                        break
-                    
-                    context = conv_text + context
-                    char_count += len(conv_text)
+        if max_tokens is None or max_tokens >= self.context_tokens:
+            if self._context is None:
+                self._context = self._render([line for line, _ in self._digest],
+                                             [text for _, _, text, _ in self._turns])
+            return self._context
         
-        return context
+        # Budget réduit : derniers échanges d'abord, puis le résumé s'il reste de la place
+        turns, digest, used = [], [], 0
+        for _, _, text, tokens in reversed(self._turns):
+            if used + tokens > max_tokens:
+                break
+            turns.append(text)
+            used += tokens
+        if len(turns) == len(self._turns):
+            for line, tokens in reversed(self._digest):
+                if used + tokens > max_tokens:
+                    break
+                digest.append(line)
+                used += tokens
+        return self._render(digest[::-1], turns[::-1])
+    
+    @staticmethod
+    def _render(digest: List[str], turns: List[str]) -> str:
+        parts = ["CONTEXTE PRÉCÉDENT:\n"]
+        if digest:
+            parts.append("Résumé des échanges antérieurs:\n")
+            parts.extend(digest)
+            parts.append("---\n")
+        parts.extend(turns)
+        return "".join(parts)
     
     def get_stats(self) -> Dict[str, Any]:
         """Retourne des statistiques sur la mémoire"""
-        human_msgs = sum(1 for msg in self.history if msg['role'] == 'human')
-        ai_msgs = sum(1 for msg in self.history if msg['role'] == 'ai')
+        human_msgs = self._role_counts["human"]
+        ai_msgs = self._role_counts["ai"]
         
         return {
             "total_messages": len(self.history),
             "human_messages": human_msgs,
             "ai_messages": ai_msgs,
             "conversations": min(human_msgs, ai_msgs),
-            "memory_usage_percent": (len(self.history) / self.max_messages) * 100
+            "memory_usage_percent": (len(self.history) / self.max_messages) * 100,
+            "context_tokens": self._turn_tokens + self._digest_used,
+            "context_turns": len(self._turns),
+            "digest_entries": len(self._digest)
         }
     
     def clear(self) -> None:
         """Efface complètement l'historique"""
-        self.history = []
+        self.history.clear()
+        self._role_counts = {"human": 0, "ai": 0}
+        self.index.clear()
+        self._reset_context()
+        self._archive_pending = False
+        if self.journal is not None:
+            self.journal.truncate()
         print("🗑️  Historique effacé")
     
-    def save(self, filename: str = "memory_backup.json") -> bool:
+    def _restore(self, records: List[Dict[str, Any]]) -> None:
+        """Remplace l'historique par des messages sauvegardés"""
+        self.history = deque((Message.from_dict(msg) for msg in records), maxlen=self.max_messages)
+        self._role_counts = {"human": 0, "ai": 0}
+        
+        self.index.clear()
+        self._reset_context()
+        for msg in self.history:
+            self._role_counts[msg.role] += 1
+            self.index.add(msg)
+            self._track(msg.role, msg.content)
+    
+    def save(self, filename: Optional[str] = None) -> bool:
         """
-        Sauvegarde l'historique dans un fichier JSON.
+        Sauvegarde l'historique.
+        
+        Avec un journal, les messages sont déjà persistés à l'ajout : sans
+        nom de fichier, save() force seulement leur écriture sur disque.
+        Sinon, l'historique est exporté dans un fichier JSON.
         
         Args:
-            filename: Nom du fichier de sauvegarde
+            filename: Fichier JSON d'export (défaut: memory_backup.json sans journal)
             
         Returns:
             True si réussi, False sinon
         """
         try:
+            if filename is None and self.journal is not None:
+                self.journal.sync()
+                print(f"💾 Journal synchronisé: {self.journal.path}")
+                return True
+            
+            filename = filename or "memory_backup.json"
             with open(filename, 'w', encoding='utf-8') as f:
                 json.dump({
-                    "history": self.history,
+                    "history": [msg.to_dict() for msg in self.history],
                     "max_messages": self.max_messages,
                     "saved_at": datetime.now().isoformat()
                 }, f, ensure_ascii=False, indent=2)
@@ -175,7 +680,10 @@ class MemoryManager:
     
     def load(self, filename: str = "memory_backup.json") -> bool:
         """
-        Charge l'historique depuis un fichier JSON.
+        Charge l'historique depuis un fichier JSON ou un journal .jsonl.
+        
+        Un journal n'est lu que depuis la fin, jusqu'aux max_messages
+        derniers messages.
         
         Args:
             filename: Nom du fichier à charger
@@ -184,11 +692,14 @@ class MemoryManager:
             True si réussi, False sinon
         """
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            self.history = data.get("history", [])
-            self.max_messages = data.get("max_messages", 20)
+            if filename.endswith(".jsonl"):
+                self._restore(read_journal_tail(filename, self.max_messages))
+            else:
+                with open(filename, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                
+                self.max_messages = data.get("max_messages", 20)
+                self._restore(data.get("history", []))
             
             print(f"📂 Historique chargé: {filename} ({len(self.history)} messages)")
             return True
@@ -203,24 +714,29 @@ class MemoryManager:
             print(f"❌ Erreur chargement: {str(e)}")
             return False
     
-    def search(self, keyword: str) -> List[Dict[str, Any]]:
+    def close(self) -> None:
+        """Écrit les messages en attente et ferme le journal"""
+        if self.journal is not None:
+            self.journal.close()
+    
+    def search(self, keyword: str, limit: Optional[int] = None) -> List[Message]:
         """
-        Recherche des messages contenant un mot-clé.
+        Recherche des messages par mots-clés (sans tenir compte des accents).
         
         Args:
-            keyword: Mot-clé à rechercher
+            keyword: Un ou plusieurs mots-clés
+            limit: Nombre maximum de résultats (défaut: tous)
             
         Returns:
-            Liste des messages correspondants
+            Liste des messages correspondants, les plus pertinents d'abord
         """
-        keyword_lower = keyword.lower()
-        results = []
-        
-        for msg in self.history:
-            if keyword_lower in msg['content'].lower():
-                results.append(msg)
-        
-        return results
+        if self._archive_pending:
+            # Première recherche après un redémarrage : indexe l'archive du journal
+            self._archive_pending = False
+            self.index.clear()
+            for record in self.journal.tail(self.index.capacity):
+                self.index.add(Message.from_dict(record))
+        return self.index.search(keyword, limit=limit)
     
     def __str__(self) -> str:
         """Représentation textuelle de la mémoire"""
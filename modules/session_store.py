@@ -0,0 +1,198 @@
+# modules/session_store.py
+"""
+Mémoires de conversation par session pour l'application web.
+
+Chaque session (un onglet Streamlit) a son MemoryManager. La mémoire totale
+est bornée : les sessions inactives depuis SESSION_TIMEOUT secondes, puis
+les moins récemment utilisées quand les plafonds globaux sont dépassés,
+sont écrites sur disque et retirées de la mémoire. Une session évincée qui
+revient est rechargée depuis son fichier.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from modules.memory_manager import MemoryManager
+
+_SAFE_ID = re.compile(r"[^A-Za-z0-9_-]")
+
+
+class SessionStore:
+    """Sessions LRU/TTL avec plafonds globaux et débordement sur disque"""
+
+    def __init__(self, max_sessions: int = 500, max_chars: int = 20_000_000,
+                 session_timeout: float = 3600, spill_dir: Optional[str] = "./sessions",
+                 spill_retention: float = 7 * 24 * 3600, max_messages: int = 50,
+                 archive_size: int = 200):
+        """
+        Args:
+            max_sessions: Nombre maximum de sessions gardées en mémoire
+            max_chars: Taille totale maximum en mémoire (caractères de l'historique
+                et de l'archive indexée de chaque session)
+            session_timeout: Inactivité (secondes) après laquelle une session est évincée
+            spill_dir: Dossier des sessions évincées (None: elles sont oubliées)
+            spill_retention: Durée de conservation (secondes) des sessions sur disque
+            max_messages: Historique gardé par session
+            archive_size: Messages consultables par recherche, par session
+        """
+        self.max_sessions = max_sessions
+        self.max_chars = max_chars
+        self.session_timeout = session_timeout
+        self.spill_dir = spill_dir
+        self.spill_retention = spill_retention
+        self.max_messages = max_messages
+        self.archive_size = archive_size
+
+        # session -> (MemoryManager, dernier accès) ; ordre = du moins au plus récent
+        self._sessions: "OrderedDict[str, list]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._total_chars = 0
+        self._lock = threading.RLock()
+        self._last_purge = 0.0
+        self.expired = 0
+        self.evicted = 0
+        self.restored = 0
+
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def _spill_path(self, session_id: str) -> Optional[str]:
+        if not self.spill_dir:
+            return None
+        return os.path.join(self.spill_dir, f"{_SAFE_ID.sub('_', session_id)}.json")
+
+    @staticmethod
+    def _footprint(memory: MemoryManager) -> int:
+        # Historique + archive consultable : l'index garde jusqu'à archive_size
+        # messages et des listes de mots de taille comparable à leur texte
+        return sum(len(msg.content) for msg in memory.history) + memory.index.chars
+
+    def get(self, session_id: str) -> MemoryManager:
+        """Mémoire de la session (rechargée depuis le disque si elle avait été évincée)"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                entry[1] = now
+                self._sessions.move_to_end(session_id)
+                return entry[0]
+
+            memory = MemoryManager(max_messages=self.max_messages, archive_size=self.archive_size)
+            path = self._spill_path(session_id)
+            if path and os.path.exists(path) and memory.load(path):
+                os.remove(path)
+                self.restored += 1
+
+            self._sessions[session_id] = [memory, now]
+            self._sizes[session_id] = self._footprint(memory)
+            self._total_chars += self._sizes[session_id]
+            self._enforce(now)
+            return memory
+
+    def add_conversation(self, session_id: str, question: str, answer: str) -> None:
+        """Enregistre un échange et fait respecter les plafonds"""
+        with self._lock:
+            memory = self.get(session_id)
+            memory.add_conversation(question, answer)
+            size = self._footprint(memory)
+            self._total_chars += size - self._sizes.get(session_id, 0)
+            self._sizes[session_id] = size
+            self._enforce(time.monotonic(), keep=session_id)
+
+    def _enforce(self, now: float, keep: Optional[str] = None) -> None:
+        """Évince les sessions expirées, puis les moins récentes au-delà des plafonds"""
+        # Les sessions sont rangées par dernier accès : les expirées sont en tête
+        while self._sessions:
+            session_id, (_, last_access) = next(iter(self._sessions.items()))
+            if now - last_access < self.session_timeout or session_id == keep:
+                break
+            self.evict(session_id)
+            self.expired += 1
+
+        while len(self._sessions) > 1 and (len(self._sessions) > self.max_sessions
+                                           or self._total_chars > self.max_chars):
+            session_id = next(iter(self._sessions))
+            if session_id == keep:
+                break
+            self.evict(session_id)
+            self.evicted += 1
+
+        if self.spill_dir and now - self._last_purge > 3600:
+            self._last_purge = now
+            self.purge_spilled()
+
+    def evict(self, session_id: str) -> bool:
+        """Écrit la session sur disque et la retire de la mémoire"""
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            if entry is None:
+                return False
+            self._total_chars -= self._sizes.pop(session_id, 0)
+            memory = entry[0]
+            path = self._spill_path(session_id)
+            if path and memory.history:
+                memory.save(path)
+            memory.close()
+            return True
+
+    def purge_spilled(self) -> int:
+        """Supprime les sessions sur disque plus anciennes que spill_retention"""
+        if not self.spill_dir:
+            return 0
+        limit = time.time() - self.spill_retention
+        removed = 0
+        for entry in os.scandir(self.spill_dir):
+            try:
+                if entry.name.endswith(".json") and entry.stat().st_mtime < limit:
+                    os.remove(entry.path)
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def drop(self, session_id: str) -> None:
+        """Oublie une session, en mémoire et sur disque"""
+        with self._lock:
+            if self._sessions.pop(session_id, None) is not None:
+                self._total_chars -= self._sizes.pop(session_id, 0)
+            path = self._spill_path(session_id)
+            if path and os.path.exists(path):
+                os.remove(path)
+
+    def flush(self) -> None:
+        """Écrit toutes les sessions sur disque (arrêt du serveur)"""
+        with self._lock:
+            for session_id in list(self._sessions):
+                self.evict(session_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Occupation mémoire et compteurs d'éviction"""
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "chars": self._total_chars,
+                "max_chars": self.max_chars,
+                "expired": self.expired,
+                "evicted": self.evicted,
+                "restored": self.restored,
+            }
+
+
+def create_session_store() -> SessionStore:
+    """
+    Crée le magasin de sessions à partir des variables d'environnement.
+
+    SESSION_TIMEOUT (secondes), SESSION_MAX, SESSION_MAX_CHARS,
+    SESSION_DIR (dossier des sessions évincées).
+    """
+    return SessionStore(
+        max_sessions=int(os.getenv("SESSION_MAX", "500")),
+        max_chars=int(os.getenv("SESSION_MAX_CHARS", "20000000")),
+        session_timeout=float(os.getenv("SESSION_TIMEOUT", "3600")),
+        spill_dir=os.getenv("SESSION_DIR", "./sessions"),
+    )
@@ -3,51 +3,140 @@
 Agent IA principal DataBot.
 """
 
-import pandas as pd
-from datetime import datetime
-from langchain.agents import initialize_agent, AgentType
-from langchain.tools import Tool
-from langchain_mistralai import ChatMistralAI
+import asyncio
+import os
+import queue
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from langchain_core.callbacks import BaseCallbackHandler
 
 from src.tools.data_analyzer import DataAnalyzer
-from src.tools.report_generator import ReportGenerator
-from src.tools.chart_tools import ChartGenerator
+from src.router import IntentRouter
+from src.utils.cache import create_response_cache
+
+class _StreamHandler(BaseCallbackHandler):
+    """
+    Relaie les événements de l'agent vers une file.
+    
+    Les jetons des étapes intermédiaires (Thought/Action) ne sont pas
+    transmis : seuls ceux qui suivent « Final Answer: » le sont, les appels
+    d'outils étant signalés par des événements « tool ».
+    """
+    
+    MARKER = "Final Answer:"
+    
+    def __init__(self, events):
+        self.events = events
+        self.buffer = ""
+        self.sent = 0
+        self.emitted = False
+    
+    def on_llm_start(self, *args, **kwargs):
+        self.buffer = ""
+        self.sent = 0
+        self.emitted = False
+    
+    on_chat_model_start = on_llm_start
+    
+    def on_llm_new_token(self, token, **kwargs):
+        self.buffer += token
+        index = self.buffer.find(self.MARKER)
+        if index < 0:
+            return
+        start = max(index + len(self.MARKER), self.sent)
+        text = self.buffer[start:]
+        if not self.emitted:
+            text = text.lstrip()
+        if text:
+            self.events.put({"type": "token", "content": text})
+            self.emitted = True
+        self.sent = len(self.buffer)
+    
+    def on_agent_action(self, action, **kwargs):
+        self.events.put({"type": "tool", "name": action.tool, "input": action.tool_input})
+
 
 class DataBot:
     """Agent IA assistant commercial"""
     
-    def __init__(self, api_key=None, model="mistral-small-latest"):
+    def __init__(self, api_key=None, model="mistral-small-latest", cache=None, data_dir=None,
+                 sales_file=None, llm=None, llm_backend=None):
         """
         Initialise DataBot.
         
         Args:
             api_key: Clé API Mistral (optionnel si dans .env)
             model: Modèle à utiliser
+            cache: ResponseCache à utiliser (défaut: selon CACHE_ENABLED/CACHE_TTL)
+            data_dir: Dossier des données dont dépend la validité du cache
+                (défaut: DATA_DIR, sinon ./data)
+            sales_file: CSV des ventes lu par le routeur et les outils
+                (défaut: SALES_FILE, sinon ventes.csv)
+            llm: Modèle LangChain déjà construit (prioritaire sur llm_backend)
+            llm_backend: Nom du backend, "mistral" ou "fake" (défaut: LLM_BACKEND)
         """
-        # Initialiser les outils
+        self.cache = cache if cache is not None else create_response_cache()
+        self.data_dir = data_dir or os.getenv("DATA_DIR", "./data")
+        self.router = IntentRouter(sales_file or os.getenv("SALES_FILE", "ventes.csv"))
+        
+        # Traitement concurrent (ask_async / ask_many)
+        self.max_concurrency = int(os.getenv("MAX_WORKERS", "4"))
+        self.request_timeout = float(os.getenv("REQUEST_TIMEOUT", "30"))
+        self._executor = None
+        
+        # Outil d'analyse (aussi utilisé hors agent, par analyze_file)
         self.data_analyzer = DataAnalyzer()
-        self.report_generator = ReportGenerator()
-        self.chart_generator = ChartGenerator()
-        
-        # Configurer le LLM
-        self.llm = ChatMistralAI(
-            model=model,
-            temperature=0.1,
-            mistral_api_key=api_key or self._get_api_key()
-        )
-        
-        # Créer les outils LangChain
-        self.tools = self._create_tools()
-        
-        # Créer l'agent
-        self.agent = initialize_agent(
-            tools=self.tools,
-            llm=self.llm,
-            agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
-            verbose=False,
-            max_iterations=3,
-            handle_parsing_errors=True
-        )
+        
+        # Temps jusqu'au premier jeton et durée totale (100 dernières questions)
+        self.ttft_history = deque(maxlen=100)
+        self.duration_history = deque(maxlen=100)
+        
+        # LLM et agent construits au premier appel qui en a besoin : les
+        # réponses du routeur et du cache n'importent jamais LangChain
+        self._llm = llm
+        self._llm_options = {
+            "backend": llm_backend,
+            "model": model,
+            "temperature": 0.1,
+            "api_key": api_key,
+        }
+        self._agent = None
+        self._build_lock = threading.Lock()
+    
+    @property
+    def llm(self):
+        """Modèle de langage (construit au premier accès)"""
+        if self._llm is None:
+            with self._build_lock:
+                if self._llm is None:
+                    from src.llm_backends import create_llm
+                    options = dict(self._llm_options)
+                    options["api_key"] = options["api_key"] or self._get_api_key()
+                    self._llm = create_llm(**options)
+        return self._llm
+    
+    @property
+    def agent(self):
+        """Agent LangChain (construit une seule fois, au premier accès)"""
+        if self._agent is None:
+            llm = self.llm
+            with self._build_lock:
+                if self._agent is None:
+                    from langchain.agents import initialize_agent, AgentType
+                    
+                    self.tools = self._create_tools()
+                    self._agent = initialize_agent(
+                        tools=self.tools,
+                        llm=llm,
+                        agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
+                        verbose=False,
+                        max_iterations=3,
+                        handle_parsing_errors=True
+                    )
+        return self._agent
     
     def _get_api_key(self):
         """Récupère la clé API depuis les variables d'environnement"""
@@ -56,6 +145,12 @@ class DataBot:
     
     def _create_tools(self):
         """Crée les outils LangChain"""
+        from langchain.tools import Tool
+        from src.tools.report_generator import ReportGenerator
+        from src.tools.chart_tools import ChartGenerator
+        
+        self.report_generator = ReportGenerator(self.router.data_path)
+        self.chart_generator = ChartGenerator(self.router.data_path)
         return [
             Tool(
                 name="AnalyseurDonnees",
@@ -74,21 +169,232 @@ class DataBot:
             )
         ]
     
+    def data_paths(self):
+        """Fichiers et dossiers lus par le routeur et les outils"""
+        paths = [self.data_dir, self.router.data_path]
+        return list(dict.fromkeys(os.path.normpath(path) for path in paths))
+    
+    def data_version(self):
+        """
+        Empreinte des données (chemin, mtime, taille de chaque fichier de
+        data_paths, dossiers parcourus récursivement).
+
+        Toute modification d'un fichier change l'empreinte, ce qui invalide
+        les réponses en cache calculées sur l'ancienne version.
+        """
+        files = []
+        for data_path in self.data_paths():
+            if os.path.isdir(data_path):
+                for root, _, names in os.walk(data_path):
+                    files.extend(os.path.join(root, name) for name in names)
+            else:
+                files.append(data_path)
+        
+        entries = []
+        for path in files:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append(f"{path}:{stat.st_mtime_ns}:{stat.st_size}")
+        return "|".join(sorted(set(entries)))
+    
     def ask(self, question):
         """
         Pose une question à DataBot.
         
+        Les questions courantes sont répondues directement par le routeur
+        d'intentions ; les questions identiques (à la casse, aux accents et à
+        la ponctuation près) sur des données inchangées sont servies depuis
+        le cache. Seules les autres passent par l'agent.
+        
         Args:
             question: Question en français
             
         Returns:
             Réponse de l'agent
         """
+        answer, version = self._lookup(question)
+        if answer is not None:
+            return answer
+        
         try:
             response = self.agent.run(question)
-            return response
         except Exception as e:
             return f"❌ Erreur: {str(e)}"
+        
+        if self.cache is not None:
+            self.cache.set(question, response, version)
+        return response
+    
+    def _lookup(self, question):
+        """Réponse sans LLM (routeur puis cache) : (réponse ou None, version des données)"""
+        direct = self.router.route(question)
+        if direct is not None:
+            return direct, ""
+        
+        version = self.data_version() if self.cache is not None else ""
+        if self.cache is not None:
+            cached = self.cache.get(question, version)
+            if cached is not None:
+                return cached, version
+        return None, version
+    
+    def stream(self, question):
+        """
+        Pose une question et produit la réponse au fur et à mesure.
+        
+        Args:
+            question: Question en français
+            
+        Yields:
+            Dictionnaires d'événements :
+            {"type": "token", "content": str} - morceau de la réponse finale
+            {"type": "tool", "name": str, "input": str} - appel d'un outil
+            {"type": "final", "content": str} - réponse complète (dernier événement)
+            {"type": "error", "content": str} - échec (dernier événement)
+        """
+        start = time.perf_counter()
+        answer, version = self._lookup(question)
+        if answer is not None:
+            self._record_latency(start, time.perf_counter())
+            yield {"type": "token", "content": answer}
+            yield {"type": "final", "content": answer}
+            return
+        
+        events = queue.Queue()
+        handler = _StreamHandler(events)
+        
+        def run():
+            try:
+                events.put({"type": "final", "content": self.agent.run(question, callbacks=[handler])})
+            except Exception as e:
+                events.put({"type": "error", "content": f"❌ Erreur: {str(e)}"})
+        
+        threading.Thread(target=run, daemon=True).start()
+        
+        first_token = None
+        deadline = start + self.request_timeout
+        while True:
+            try:
+                event = events.get(timeout=max(0.0, deadline - time.perf_counter()))
+            except queue.Empty:
+                yield {"type": "error", "content": f"❌ Erreur: délai de {self.request_timeout:.0f}s dépassé"}
+                return
+            
+            if first_token is None and event["type"] in ("token", "final"):
+                first_token = time.perf_counter()
+            if event["type"] == "final":
+                self._record_latency(start, first_token)
+                if self.cache is not None:
+                    self.cache.set(question, event["content"], version)
+            yield event
+            if event["type"] in ("final", "error"):
+                return
+    
+    def stream_text(self, question):
+        """
+        Variante de stream ne produisant que du texte à afficher.
+        
+        Si le modèle n'a rien envoyé jeton par jeton, la réponse complète
+        est produite d'un bloc à la fin.
+        """
+        streamed = False
+        for event in self.stream(question):
+            if event["type"] == "token":
+                streamed = True
+                yield event["content"]
+            elif event["type"] == "tool":
+                yield f"🔧 {event['name']}...\n"
+            elif event["type"] == "error" or (event["type"] == "final" and not streamed):
+                yield event["content"]
+    
+    def _record_latency(self, start, first_token):
+        self.ttft_history.append(first_token - start)
+        self.duration_history.append(time.perf_counter() - start)
+    
+    def latency_stats(self):
+        """Temps jusqu'au premier jeton (TTFT) et durée totale, en secondes"""
+        if not self.ttft_history:
+            return {"questions": 0}
+        ttft = sorted(self.ttft_history)
+        return {
+            "questions": len(ttft),
+            "ttft_mean": statistics.fmean(ttft),
+            "ttft_p50": ttft[len(ttft) // 2],
+            "ttft_p95": ttft[min(len(ttft) - 1, int(len(ttft) * 0.95))],
+            "duration_mean": statistics.fmean(self.duration_history),
+        }
+    
+    async def ask_async(self, question, timeout=None):
+        """
+        Version asynchrone de ask.
+        
+        L'appel bloquant (réseau vers Mistral) s'exécute dans un thread, ce
+        qui laisse la boucle asyncio traiter d'autres questions pendant
+        l'attente.
+        
+        Args:
+            question: Question en français
+            timeout: Délai maximum en secondes (défaut: REQUEST_TIMEOUT),
+                attente d'un thread libre comprise
+            
+        Returns:
+            Réponse de l'agent, ou message d'erreur si le délai est dépassé
+        """
+        timeout = self.request_timeout if timeout is None else timeout
+        if self._executor is None:
+            # Threads en double : ceux des questions expirées, qui finissent en
+            # arrière-plan, ne privent pas les suivantes d'un thread libre
+            self._executor = ThreadPoolExecutor(
+                max_workers=2 * self.max_concurrency, thread_name_prefix="databot"
+            )
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        started = asyncio.Event()
+        
+        def run():
+            loop.call_soon_threadsafe(started.set)
+            return self.ask(question)
+        
+        future = loop.run_in_executor(self._executor, run)
+        try:
+            await asyncio.wait_for(started.wait(), max(0.0, deadline - loop.time()))
+            return await asyncio.wait_for(future, max(0.0, deadline - loop.time()))
+        except asyncio.TimeoutError:
+            # Pas encore démarrée : retirée de la file ; sinon le thread
+            # termine en arrière-plan et sa réponse est ignorée
+            future.cancel()
+            return f"❌ Erreur: délai de {timeout:.0f}s dépassé"
+    
+    async def ask_many(self, questions, concurrency=None, timeout=None):
+        """
+        Pose plusieurs questions en parallèle.
+        
+        Args:
+            questions: Liste de questions
+            concurrency: Nombre max de questions simultanées (défaut et
+                plafond: MAX_WORKERS)
+            timeout: Délai par question en secondes (défaut: REQUEST_TIMEOUT)
+            
+        Returns:
+            Réponses dans l'ordre des questions
+        """
+        semaphore = asyncio.Semaphore(min(concurrency or self.max_concurrency, self.max_concurrency))
+        
+        async def limited(question):
+            async with semaphore:
+                return await self.ask_async(question, timeout=timeout)
+        
+        return await asyncio.gather(*(limited(q) for q in questions))
+    
+    def cache_stats(self):
+        """Statistiques du cache de réponses"""
+        return self.cache.stats() if self.cache is not None else {"enabled": False}
+    
+    def routing_stats(self):
+        """Part des questions répondues sans appel au LLM"""
+        return self.router.stats()
     
     def analyze_file(self, file_path):
         """
@@ -100,12 +406,10 @@ class DataBot:
         Returns:
             Analyse des données
         """
-        try:
-            df = pd.read_csv(file_path)
-            summary = self.data_analyzer.get_summary(df)
-            return summary
-        except Exception as e:
-            return f"❌ Erreur lecture fichier: {str(e)}"
+        results = self.data_analyzer.analyze_csv(file_path)
+        if not results.get("success"):
+            return f"❌ Erreur lecture fichier: {results.get('error')}"
+        return self.data_analyzer.format_results(results)
 
 # Fonction simple pour utilisation rapide
 def create_databot():
@@ -0,0 +1,118 @@
+# src/llm_backends.py
+"""
+Fabriques de modèles de langage pour DataBot.
+
+Le backend est choisi par nom ("mistral" par défaut, ou LLM_BACKEND dans
+.env). Le backend "fake" rejoue des traces ReAct scriptées avec une latence
+configurable : il permet de tester et de mesurer la boucle de l'agent sans
+réseau ni clé API.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.language_models.llms import LLM
+from pydantic import PrivateAttr
+
+# Une question = une action puis une réponse finale (2 appels au modèle)
+DEFAULT_TRACE = [
+    "Thought: Je dois consulter les données de vente.\n"
+    "Action: AnalyseurDonnees\n"
+    "Action Input: ventes.csv",
+    "Thought: J'ai les informations nécessaires.\n"
+    "Final Answer: Les ventes sont stables sur la période analysée.",
+]
+
+
+class ScriptedReActLLM(LLM):
+    """
+    Modèle local déterministe qui rejoue une trace ReAct.
+
+    Chaque appel renvoie la réponse de `responses` qui correspond à l'étape
+    de l'exécution en cours (en boucle), après `latency` secondes, en
+    émettant les jetons un par un (mot par mot) avec `token_latency`
+    secondes entre chacun. L'étape est déduite du prompt (nombre
+    d'observations déjà reçues depuis la question) : des exécutions
+    simultanées de l'agent ne se prennent pas leurs étapes.
+    """
+
+    responses: List[str] = DEFAULT_TRACE
+    latency: float = 0.0
+    token_latency: float = 0.0
+
+    _calls: int = PrivateAttr(default=0)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-react"
+
+    @property
+    def calls(self) -> int:
+        """Nombre d'appels reçus"""
+        return self._calls
+
+    @staticmethod
+    def step(prompt: str) -> int:
+        """Étape ReAct d'un prompt : observations reçues après la dernière question"""
+        return prompt[prompt.rfind("Question:"):].count("Observation:")
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None,
+              run_manager=None, **kwargs: Any) -> str:
+        with self._lock:
+            self._calls += 1
+        response = self.responses[self.step(prompt) % len(self.responses)]
+        if self.latency:
+            time.sleep(self.latency)
+        if run_manager is not None:
+            words = response.split(" ")
+            for i, word in enumerate(words):
+                if self.token_latency:
+                    time.sleep(self.token_latency)
+                run_manager.on_llm_new_token(word if i == 0 else " " + word)
+        return response
+
+
+def _create_mistral(model: str, temperature: float, api_key: Optional[str], **kwargs) -> Any:
+    from langchain_mistralai import ChatMistralAI
+    return ChatMistralAI(
+        model=model,
+        temperature=temperature,
+        streaming=True,
+        mistral_api_key=api_key or os.getenv("MISTRAL_API_KEY"),
+        **kwargs
+    )
+
+
+def _create_fake(model: str, temperature: float, api_key: Optional[str], **kwargs) -> Any:
+    if "latency" not in kwargs and os.getenv("FAKE_LLM_LATENCY"):
+        kwargs["latency"] = float(os.getenv("FAKE_LLM_LATENCY"))
+    return ScriptedReActLLM(**kwargs)
+
+
+LLM_BACKENDS: Dict[str, Callable[..., Any]] = {
+    "mistral": _create_mistral,
+    "fake": _create_fake,
+}
+
+
+def create_llm(backend: Optional[str] = None, model: str = "mistral-small-latest",
+               temperature: float = 0.1, api_key: Optional[str] = None, **kwargs) -> Any:
+    """
+    Crée le modèle de langage du backend demandé.
+
+    Args:
+        backend: Nom du backend (défaut: LLM_BACKEND, sinon "mistral")
+        model: Nom du modèle (backends distants)
+        temperature: Température d'échantillonnage
+        api_key: Clé API (backends distants)
+        **kwargs: Options propres au backend (ex: latency pour "fake")
+    """
+    name = (backend or os.getenv("LLM_BACKEND") or "mistral").lower()
+    try:
+        factory = LLM_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Backend LLM inconnu: {name!r} (disponibles: {', '.join(LLM_BACKENDS)})") from None
+    return factory(model=model, temperature=temperature, api_key=api_key, **kwargs)
@@ -11,10 +11,8 @@ from pathlib import Path
 # Ajouter le dossier courant au path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from src.agent import DataBot
-from src.utils.config import Config
-from src.utils.logger import setup_logger
-from src.tools.data_analyzer import DataAnalyzer
+# Les modules lourds (LangChain, pandas...) sont importés dans chaque mode :
+# --file ou --report ne chargent pas l'agent IA (voir --profile-startup)
 
 
 def print_banner():
@@ -35,6 +33,10 @@ def interactive_mode():
     print("🔧 Initialisation de DataBot...")
     
     try:
+        from src.agent import DataBot
+        from src.utils.config import Config
+        from src.utils.logger import setup_logger
+        
         # Configuration
         config = Config()
         logger = setup_logger("databot")
@@ -61,14 +63,13 @@ def interactive_mode():
                 if not question:
                     continue
                 
-                # Traitement
+                # Traitement et affichage au fil de l'eau
                 print("🤖 DataBot analyse...")
-                response = bot.ask(question)
-                
-                # Affichage réponse
                 print(f"\n📊 Réponse:")
                 print("-" * 40)
-                print(response)
+                for chunk in bot.stream_text(question):
+                    print(chunk, end="", flush=True)
+                print()
                 print("-" * 40)
                 
                 # Log
@@ -85,6 +86,10 @@ def interactive_mode():
         # Statistiques
         print(f"\n📈 Session terminée:")
         print(f"   • Questions traitées: {conversation_count}")
+        latency = bot.latency_stats()
+        if latency.get("questions"):
+            print(f"   • Premier jeton: {latency['ttft_p50']:.2f}s (médiane), "
+                  f"{latency['ttft_p95']:.2f}s (p95)")
         print(f"   • Logs disponibles: logs/databot.log")
         
     except Exception as e:
@@ -92,13 +97,48 @@ def interactive_mode():
         sys.exit(1)
 
 
-def analyze_file_mode(file_path):
-    """Mode analyse de fichier"""
+def batch_mode(questions_file):
+    """Mode lot : répond en parallèle aux questions d'un fichier (une par ligne)"""
+    import asyncio
+    import time
+    
+    print(f"📝 Questions: {questions_file}")
+    
+    try:
+        from dotenv import load_dotenv
+        from src.agent import DataBot
+        
+        with open(questions_file, encoding="utf-8") as f:
+            questions = [line.strip() for line in f if line.strip()]
+        
+        # Clé API et réglages lus dans l'environnement / .env (pas de config/settings.json)
+        load_dotenv()
+        bot = DataBot()
+        
+        start = time.perf_counter()
+        responses = asyncio.run(bot.ask_many(questions))
+        elapsed = time.perf_counter() - start
+        
+        for i, (question, response) in enumerate(zip(questions, responses), 1):
+            print(f"\n[Q{i}] 👤 {question}")
+            print("-" * 40)
+            print(response)
+        
+        print(f"\n⏱️  {len(questions)} questions traitées en {elapsed:.1f}s")
+        
+    except Exception as e:
+        print(f"❌ Erreur: {str(e)}")
+
+
+def analyze_file_mode(file_path, chunk_size=None):
+    """Mode analyse de fichier (lecture par blocs, mémoire bornée)"""
     print(f"📁 Analyse du fichier: {file_path}")
     
     try:
+        from src.tools.data_analyzer import DataAnalyzer
+        
         analyzer = DataAnalyzer()
-        results = analyzer.analyze_csv(file_path)
+        results = analyzer.analyze_csv(file_path, chunk_size=chunk_size, progress=True)
         
         print("\n📊 RÉSULTATS DE L'ANALYSE:")
         print("=" * 60)
@@ -123,6 +163,44 @@ def analyze_file_mode(file_path):
         print(f"❌ Erreur d'analyse: {str(e)}")
 
 
+def analyze_directory_mode(path, pattern="*.csv", workers=None, chunk_size=None):
+    """Mode analyse de plusieurs fichiers en parallèle"""
+    print(f"📂 Analyse des fichiers: {path}")
+    
+    try:
+        from src.tools.data_analyzer import DataAnalyzer
+        
+        analyzer = DataAnalyzer()
+        results = analyzer.analyze_files(path, pattern=pattern, max_workers=workers, chunk_size=chunk_size)
+        
+        print("\n📊 RÉSULTATS DE L'ANALYSE:")
+        print("=" * 60)
+        
+        if results.get("success"):
+            stats = results.get("statistics", {})
+            speed = results["throughput"]
+            
+            print(f"✅ {results['files']} fichiers analysés ({speed['workers']} processus)")
+            print(f"   • Lignes: {stats.get('row_count', 0)}")
+            print(f"   • Colonnes: {stats.get('column_count', 0)}")
+            print(f"   • Données: {stats.get('period', 'N/A')}")
+            print(f"   • Débit: {speed['files_per_sec']:.1f} fichiers/s, {speed['mb_per_sec']:.1f} Mo/s")
+            
+            for error in results["errors"]:
+                print(f"   ⚠️  {error}")
+            
+            if "insights" in results:
+                print("\n💡 INSIGHTS:")
+                for insight in results["insights"][:3]:  # Top 3 insights
+                    print(f"   • {insight}")
+                    
+        else:
+            print(f"❌ Erreur: {results.get('error', 'Unknown error')}")
+            
+    except Exception as e:
+        print(f"❌ Erreur d'analyse: {str(e)}")
+
+
 def generate_report_mode(output_dir="reports"):
     """Mode génération de rapport"""
     print(f"📋 Génération de rapport dans: {output_dir}")
@@ -141,6 +219,44 @@ def generate_report_mode(output_dir="reports"):
         print(f"❌ Erreur génération rapport: {str(e)}")
 
 
+def profile_startup_mode(top=10):
+    """
+    Profil des imports au démarrage, mode par mode.
+    
+    Retourne 1 si un mode hors IA charge un module lourd (LangChain,
+    Streamlit, Plotly...), pour détecter les régressions en CI.
+    """
+    from src.utils.profiling import profile_imports
+    
+    # (mode, module importé, modules lourds interdits)
+    targets = [
+        ("Démarrage CLI", "src.main", True),
+        ("--file / --dir", "src.tools.data_analyzer", True),
+        ("Mode interactif / --batch", "src.agent", False),
+    ]
+    
+    print("⏱️  PROFIL DE DÉMARRAGE (python -X importtime)")
+    print("=" * 60)
+    
+    status = 0
+    for label, module, strict in targets:
+        profile = profile_imports(module, top=top)
+        print(f"\n📦 {label} - import {module}: {profile['total_ms']:.0f} ms "
+              f"({profile['modules']} modules)")
+        if profile["error"]:
+            print(f"   ⚠️  {profile['error']}")
+        for entry in profile["top"]:
+            indent = "  " * entry["depth"]
+            print(f"   {entry['cumulative_us'] / 1000:8.1f} ms  {indent}{entry['name']}")
+        if strict and profile["forbidden_loaded"]:
+            print(f"   ❌ Modules lourds chargés: {', '.join(profile['forbidden_loaded'])}")
+            status = 1
+    
+    print("\n" + "=" * 60)
+    print("✅ Aucun module lourd au démarrage" if status == 0 else "❌ Régression du temps de démarrage")
+    return status
+
+
 def main():
     """Fonction principale"""
     parser = argparse.ArgumentParser(
@@ -150,7 +266,10 @@ def main():
 Exemples:
   %(prog)s                    # Mode interactif
   %(prog)s --file ventes.csv  # Analyse de fichier
+  %(prog)s --dir data/historique  # Analyse parallèle d'un dossier
   %(prog)s --report           # Génération de rapport
+  %(prog)s --batch questions.txt  # Questions en parallèle
+  %(prog)s --profile-startup  # Temps d'import au démarrage
   %(prog)s --version          # Version du programme
         """
     )
@@ -161,12 +280,52 @@ Exemples:
         metavar="FILE"
     )
     
+    parser.add_argument(
+        "-b", "--batch",
+        help="Répondre en parallèle aux questions d'un fichier (une par ligne)",
+        metavar="FILE"
+    )
+    
+    parser.add_argument(
+        "--dir",
+        help="Analyser tous les CSV d'un dossier (ou un motif glob) en parallèle",
+        metavar="DIR"
+    )
+    
+    parser.add_argument(
+        "--pattern",
+        default="*.csv",
+        help="Motif des fichiers à analyser avec --dir (défaut: *.csv)"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Nombre de processus pour --dir (défaut: MAX_WORKERS)",
+        metavar="N"
+    )
+    
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help="Lignes lues par bloc lors de l'analyse (défaut: 100000)",
+        metavar="N"
+    )
+    
     parser.add_argument(
         "-r", "--report",
         action="store_true",
         help="Générer un rapport complet"
     )
     
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Mesurer le temps d'import au démarrage (python -X importtime)"
+    )
+    
     parser.add_argument(
         "-v", "--version",
         action="version",
@@ -182,8 +341,15 @@ Exemples:
     args = parser.parse_args()
     
     # Exécution selon les arguments
-    if args.file:
-        analyze_file_mode(args.file)
+    if args.profile_startup:
+        sys.exit(profile_startup_mode())
+    elif args.file:
+        analyze_file_mode(args.file, chunk_size=args.chunk_size)
+    elif args.dir:
+        analyze_directory_mode(args.dir, pattern=args.pattern, workers=args.workers,
+                               chunk_size=args.chunk_size)
+    elif args.batch:
+        batch_mode(args.batch)
     elif args.report:
         generate_report_mode()
     else:
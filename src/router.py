@@ -0,0 +1,199 @@
+# src/router.py
+"""
+Routeur d'intentions placé devant l'agent IA.
+
+Les questions fréquentes (produit le plus vendu, chiffre d'affaires, stock
+faible, liste des produits...) sont reconnues par des expressions
+régulières compilées et répondues directement avec pandas, en quelques
+millisecondes. Seules les formes directes de ces questions sont reconnues,
+et les réponses portent sur l'ensemble des données : une question ouverte
+(comment, pourquoi, prévision, comparaison...) ou qui cite un produit, une
+catégorie, un client ou une période est laissée au LLM, comme toutes les
+autres questions.
+"""
+
+import os
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from modules.dataset_cache import load_dataset
+from src.utils.cache import normalize_question
+
+STOCK_THRESHOLD = int(os.getenv("STOCK_WARNING_THRESHOLD", "50"))
+
+
+def prepare_sales(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Colonnes dérivées communes : Ventes_Total, Prix, CA.
+
+    Accepte le format trimestriel (Ventes_Q1, Ventes_Q2...) comme le
+    format du tableau de bord (Ventes, Prix (€)).
+    """
+    sales_cols = [c for c in df.columns if str(c).startswith("Ventes") and c != "Ventes_Total"]
+    if "Ventes_Total" not in df and sales_cols:
+        df["Ventes_Total"] = df[sales_cols].sum(axis=1)
+    if "Prix" not in df and "Prix (€)" in df:
+        df["Prix"] = df["Prix (€)"]
+    if "Ventes_Total" in df and "Prix" in df:
+        df["CA"] = df["Ventes_Total"] * df["Prix"]
+    return df
+
+
+def _top_product(df: pd.DataFrame) -> str:
+    meilleur = df.loc[df["Ventes_Total"].idxmax()]
+    return f"Produit le plus vendu : {meilleur['Produit']} ({meilleur['Ventes_Total']} unités)"
+
+
+def _revenue(df: pd.DataFrame) -> str:
+    return f"Chiffre d'affaires : {df['CA'].sum():.2f} €"
+
+
+def _low_stock(df: pd.DataFrame) -> str:
+    faible = df[df["Stock"] < STOCK_THRESHOLD]
+    if len(faible) > 0:
+        return f"Stock faible : {', '.join(faible['Produit'].tolist())}"
+    return "Stock OK pour tous les produits"
+
+
+def _product_list(df: pd.DataFrame) -> str:
+    return f"Produits : {', '.join(df['Produit'].tolist())}"
+
+
+def _greeting(df: pd.DataFrame) -> str:
+    return ("Bonjour ! Je suis DataBot, votre assistant commercial IA. "
+            "Posez-moi des questions sur vos ventes, stocks ou performances.")
+
+
+# (intention, motif sur la question normalisée, réponse, colonnes requises)
+# Les motifs sont ancrés en début de question sur les formes directes
+# (« quel est... », « donne... », « liste des produits ») : une question qui
+# ne fait que mentionner le sujet va au LLM. La première reconnue l'emporte.
+_ASK = r"^(quels?|quelles?|donne|donnez|montre|montrez|affiche|liste|indique)\b[^?]*"
+INTENTS: List[Tuple[str, str, Callable[[pd.DataFrame], str], Tuple[str, ...]]] = [
+    ("salutation", r"^(bonjour|salut|hello|bonsoir)( databot)?\W*$", _greeting, ()),
+    ("stock_faible",
+     _ASK + r"\b(stocks? (est |sont )?(faibles?|bas|critiques?)|en rupture|(a )?reapprovisionn\w*)\b",
+     _low_stock, ("Produit", "Stock")),
+    ("plus_vendu",
+     _ASK + r"\b(plus vendus?|meilleures? ventes?|top produits?)\b|^(le )?top produits?$",
+     _top_product, ("Produit", "Ventes_Total")),
+    # « ca » seul est aussi « ça » une fois les accents retirés
+    ("chiffre_affaires",
+     _ASK + r"\b(chiffre d.?affaires?|ca (total|global)|(total|global) (du |de )?ca)\b"
+     r"|^(le )?(chiffre d.?affaires?( total| global)?|ca (total|global))$",
+     _revenue, ("CA",)),
+    ("liste_produits",
+     r"^((donne|donnez|montre|montrez|affiche)([- ]moi)? )?(la )?liste (des |de nos |de vos )?produits\b"
+     r"|^quels produits (vendons|avons|propos)",
+     _product_list, ("Produit",)),
+]
+
+# Question ouverte (explication, prévision, moyenne, comparaison, par catégorie) : au LLM
+OPEN_ENDED = (r"\b(comment|pourquoi|previsions?|prevoi\w*|prevu\w*|moyens?|moyennes?|compar\w*"
+              r"|categories?|moins|evolution|tendances?|analys\w*|expliqu\w*)\b")
+
+# Question restreinte (client, période, ventilation) : la réponse globale ne convient pas
+SCOPED = (r"\bclients?\b|\bq[1-4]\b|\b(trimestre|semestre|mois|semaine|annee|jour)s?\b|\b(19|20)\d\d\b"
+          r"|\b(hier|aujourd|depuis|entre|par|dernier|derniere)\b"
+          r"|\b(janvier|fevrier|mars|avril|mai|juin|juillet|aout|septembre|octobre|novembre|decembre)\b"
+          r"|\b(regions?|vendeurs?|magasins?)\b")
+
+# Colonnes dont les valeurs citées dans une question la restreignent
+SCOPE_COLUMNS = ("Produit", "Catégorie", "Categorie", "Client")
+
+
+class IntentRouter:
+    """Répond aux intentions connues sans passer par le LLM"""
+
+    def __init__(self, data_path: str = "ventes.csv"):
+        """
+        Args:
+            data_path: Fichier CSV des ventes utilisé pour les réponses directes
+        """
+        self.data_path = data_path
+        self.intents = [(name, re.compile(pattern), handler, required)
+                        for name, pattern, handler, required in INTENTS]
+        self.scoped = re.compile(f"{SCOPED}|{OPEN_ENDED}")
+        self._names: Tuple[Optional[pd.DataFrame], Optional[re.Pattern]] = (None, None)
+        self._lock = threading.Lock()
+        self.total = 0
+        self.served: Dict[str, int] = {name: 0 for name, *_ in INTENTS}
+
+    def classify(self, question: str) -> Optional[str]:
+        """Nom de l'intention reconnue, ou None pour une question ouverte"""
+        text = normalize_question(question)
+        if self.scoped.search(text):
+            return None
+        for name, pattern, _, _ in self.intents:
+            if pattern.search(text):
+                return name
+        return None
+
+    def _names_pattern(self, df: pd.DataFrame) -> Optional[re.Pattern]:
+        """Motif des produits, catégories et clients des données (recalculé si elles changent)"""
+        cached_df, pattern = self._names
+        if cached_df is df:
+            return pattern
+        names = set()
+        for col in SCOPE_COLUMNS:
+            if col in df:
+                names.update(normalize_question(v) for v in df[col].dropna().unique())
+        names.discard("")
+        pattern = None
+        if names:
+            alternatives = "|".join(re.escape(n) for n in sorted(names, key=len, reverse=True))
+            pattern = re.compile(rf"\b({alternatives})\b")
+        self._names = (df, pattern)
+        return pattern
+
+    def _is_scoped(self, text: str, df: Optional[pd.DataFrame]) -> bool:
+        """
+        Vrai si la question est ouverte ou cite une période, un client, un
+        produit ou une catégorie
+        """
+        if self.scoped.search(text):
+            return True
+        if df is None:
+            return False
+        pattern = self._names_pattern(df)
+        return pattern is not None and pattern.search(text) is not None
+
+    def route(self, question: str) -> Optional[str]:
+        """
+        Répond directement si l'intention est connue.
+
+        Returns:
+            La réponse, ou None si la question doit aller au LLM
+        """
+        with self._lock:
+            self.total += 1
+        text = normalize_question(question)
+        for name, pattern, handler, required in self.intents:
+            if not pattern.search(text):
+                continue
+            try:
+                df = load_dataset(self.data_path, derive=prepare_sales) if required else None
+            except (OSError, pd.errors.ParserError):
+                return None
+            if df is not None and any(col not in df for col in required):
+                return None
+            if required and self._is_scoped(text, df):
+                return None
+            answer = handler(df)
+            with self._lock:
+                self.served[name] += 1
+            return answer
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Part des questions servies sans le LLM"""
+        fast = sum(self.served.values())
+        return {
+            "questions": self.total,
+            "fast_path": fast,
+            "fast_path_share": fast / self.total if self.total else 0.0,
+            "by_intent": dict(self.served),
+        }
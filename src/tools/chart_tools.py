@@ -0,0 +1,67 @@
+# src/tools/chart_tools.py
+"""
+Outil de graphiques de l'agent DataBot (GenerateurGraphiques).
+
+Les figures sont construites par modules.chart_generator, dont le cache
+rend les demandes répétées sur des données inchangées quasi gratuites.
+"""
+
+import hashlib
+import os
+from typing import Optional
+
+from modules.chart_generator import ChartGenerator as Charts
+from modules.dataset_cache import load_dataset
+from src.router import prepare_sales
+from src.utils.cache import normalize_question
+
+
+class ChartGenerator:
+    """Crée un graphique des ventes à partir d'une demande en français"""
+
+    def __init__(self, data_path: Optional[str] = None, output_dir: Optional[str] = None):
+        """
+        Args:
+            data_path: CSV des ventes (défaut: SALES_FILE, sinon ventes.csv)
+            output_dir: Dossier des graphiques HTML (défaut: EXPORT_DIR, sinon ./exports)
+        """
+        self.data_path = data_path or os.getenv("SALES_FILE", "ventes.csv")
+        self.output_dir = output_dir or os.getenv("EXPORT_DIR", "./exports")
+
+    def create_chart(self, query: str) -> str:
+        """
+        Point d'entrée de l'outil.
+
+        « camembert », « répartition » ou « part » donnent la répartition du
+        CA ; « tendance » ou « évolution » une courbe (si les données ont
+        une colonne Date) ; sinon les ventes par produit en barres.
+        """
+        try:
+            df = load_dataset(self.data_path, derive=prepare_sales)
+        except Exception as e:
+            return f"❌ Erreur lecture données: {e}"
+
+        text = normalize_question(query)
+        if any(word in text for word in ("camembert", "repartition", "part")) and "CA" in df:
+            name = "repartition_ca"
+            fig = Charts.generate_revenue_pie(df, value_col="CA", name_col="Produit")
+        elif any(word in text for word in ("tendance", "evolution")) and "Date" in df:
+            name = "tendance_ventes"
+            fig = Charts.generate_trend_line(df, x_col="Date", y_col="Ventes_Total", freq="D")
+        elif "Ventes_Total" in df:
+            name = "ventes_par_produit"
+            fig = Charts.generate_sales_bar(df, x_col="Produit", y_col="Ventes_Total")
+        else:
+            return "❌ Colonnes nécessaires absentes (Produit, Ventes...)"
+
+        if fig is None:
+            return "❌ Erreur génération graphique"
+
+        # Même figure (même contenu) -> même fichier, écrit une seule fois
+        fig_json = Charts.figure_json(fig)
+        digest = hashlib.sha1(fig_json.encode("utf-8")).hexdigest()[:12]
+        path = os.path.join(self.output_dir, f"{name}_{digest}.html")
+        if not os.path.exists(path):
+            os.makedirs(self.output_dir, exist_ok=True)
+            fig.write_html(path, include_plotlyjs="cdn")
+        return f"Graphique « {fig.layout.title.text} » enregistré : {path}"
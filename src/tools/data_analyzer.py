@@ -0,0 +1,392 @@
+# src/tools/data_analyzer.py
+"""
+Outil d'analyse de fichiers de données pour DataBot.
+
+Les fichiers CSV sont lus par blocs (chunks) en une seule passe : les
+statistiques sont accumulées bloc par bloc, la mémoire utilisée dépend de
+la taille des blocs et non de celle du fichier.
+"""
+
+import glob
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import pandas as pd
+
+DEFAULT_CHUNK_SIZE = 100_000
+MAX_TRACKED_VALUES = 1000
+
+
+class ColumnStats:
+    """Statistiques d'une colonne, fusionnables bloc par bloc"""
+
+    def __init__(self, name: str, max_values: int = MAX_TRACKED_VALUES):
+        self.name = name
+        self.max_values = max_values
+        self.count = 0
+        self.nulls = 0
+        # Colonnes numériques : moyenne/variance par l'algorithme de Chan
+        self.numeric = None
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+        # Comptage borné des valeurs, tenu aussi pour les blocs numériques
+        # (tant qu'ils ont moins de max_values valeurs distinctes) afin que
+        # la colonne reste juste si elle devient texte
+        self.values: Counter = Counter()
+        self.truncated = False
+
+    def update(self, series: pd.Series) -> None:
+        """Ajoute un bloc de valeurs"""
+        nulls = int(series.isna().sum())
+        self.nulls += nulls
+        values = series.dropna()
+        if values.empty:
+            return
+
+        is_numeric = pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values)
+        if self.numeric is None:
+            self.numeric = is_numeric
+        elif self.numeric and not is_numeric:
+            # Un bloc non numérique déclasse la colonne en texte
+            self.numeric = False
+
+        if self.numeric:
+            n = len(values)
+            self._merge_moments(n, float(values.sum()), float(values.mean()),
+                                float(((values - values.mean()) ** 2).sum()),
+                                values.min(), values.max())
+            if not self.truncated:
+                # Comptage sur les nombres, seules les valeurs distinctes sont converties en texte
+                counts = values.value_counts()
+                counts.index = counts.index.astype(str)
+                self._merge_values(counts)
+        else:
+            self.count += len(values)
+            self._merge_values(values.astype(str).value_counts())
+
+    def _merge_moments(self, n, total, mean, m2, vmin, vmax) -> None:
+        if self.count == 0:
+            self.mean, self.m2 = mean, m2
+        else:
+            delta = mean - self.mean
+            combined = self.count + n
+            self.mean += delta * n / combined
+            self.m2 += m2 + delta * delta * self.count * n / combined
+        self.count += n
+        self.total += total
+        self.min = vmin if self.min is None else min(self.min, vmin)
+        self.max = vmax if self.max is None else max(self.max, vmax)
+
+    def _merge_values(self, counts) -> None:
+        # Colonne numérique au-delà du plafond : le comptage est abandonné
+        if self.truncated and self.numeric:
+            return
+        if not isinstance(counts, pd.Series):
+            counts = pd.Series(counts, dtype="int64")
+        if len(self.values) + len(counts) > self.max_values:
+            # Les valeurs déjà suivies sont toujours comptées ; les nouvelles,
+            # les plus fréquentes d'abord, dans la limite de la place restante
+            known = counts.index.isin(list(self.values))
+            new = counts[~known]
+            room = self.max_values - len(self.values)
+            if len(new) > room:
+                self.truncated = True
+                new = new.sort_values(ascending=False).iloc[:room]
+            counts = pd.concat([counts[known], new])
+        self.values.update(dict(zip(counts.index, counts.tolist())))
+
+    def merge(self, other: "ColumnStats") -> None:
+        """Fusionne les statistiques d'une autre portion des données"""
+        self.nulls += other.nulls
+        if other.numeric is None:
+            return
+        if self.numeric is None:
+            self.numeric = other.numeric
+        if self.numeric and other.numeric:
+            if other.count:
+                self._merge_moments(other.count, other.total, other.mean, other.m2,
+                                    other.min, other.max)
+        else:
+            self.numeric = False
+            self.count += other.count
+        self._merge_values(other.values)
+        self.truncated = self.truncated or other.truncated
+
+    def to_dict(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {"count": self.count, "nulls": self.nulls}
+        if self.numeric:
+            stats.update({
+                "type": "numeric",
+                "sum": self.total,
+                "mean": self.mean,
+                "std": (self.m2 / (self.count - 1)) ** 0.5 if self.count > 1 else 0.0,
+                "min": self.min,
+                "max": self.max,
+            })
+        else:
+            top = self.values.most_common(1)
+            stats.update({
+                "type": "text",
+                "distinct": f">{self.max_values}" if self.truncated else len(self.values),
+                "top": top[0][0] if top else None,
+                "top_count": top[0][1] if top else 0,
+            })
+        return stats
+
+
+class DatasetProfile:
+    """Profil d'un jeu de données construit bloc par bloc"""
+
+    def __init__(self, max_values: int = MAX_TRACKED_VALUES):
+        self.max_values = max_values
+        self.row_count = 0
+        self.columns: Dict[str, ColumnStats] = {}
+        self.date_columns: List[str] = []
+        self.date_min = None
+        self.date_max = None
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Intègre un bloc de lignes"""
+        if not self.columns and not self.row_count:
+            self.date_columns = [c for c in chunk.columns if 'date' in str(c).lower()]
+        self.row_count += len(chunk)
+        for name in chunk.columns:
+            stats = self.columns.get(name)
+            if stats is None:
+                stats = self.columns[name] = ColumnStats(name, self.max_values)
+            stats.update(chunk[name])
+        for name in self.date_columns:
+            if name in chunk:
+                dates = pd.to_datetime(chunk[name], errors='coerce').dropna()
+                if not dates.empty:
+                    self._merge_period(dates.min(), dates.max())
+
+    def _merge_period(self, start, end) -> None:
+        self.date_min = start if self.date_min is None else min(self.date_min, start)
+        self.date_max = end if self.date_max is None else max(self.date_max, end)
+
+    def merge(self, other: "DatasetProfile") -> None:
+        """Fusionne le profil d'un autre fichier ou d'une autre portion"""
+        self.row_count += other.row_count
+        for name, stats in other.columns.items():
+            if name in self.columns:
+                self.columns[name].merge(stats)
+            else:
+                self.columns[name] = stats
+        self.date_columns += [c for c in other.date_columns if c not in self.date_columns]
+        if other.date_min is not None:
+            self._merge_period(other.date_min, other.date_max)
+
+    @property
+    def period(self) -> str:
+        if self.date_min is None:
+            return "N/A"
+        days = (self.date_max - self.date_min).days + 1
+        return f"{self.date_min:%Y-%m-%d} → {self.date_max:%Y-%m-%d} ({days} jours)"
+
+    def statistics(self) -> Dict[str, Any]:
+        return {
+            "row_count": self.row_count,
+            "column_count": len(self.columns),
+            "period": self.period,
+            "columns": {name: stats.to_dict() for name, stats in self.columns.items()},
+        }
+
+    def insights(self) -> List[str]:
+        """Observations principales, par ordre d'importance"""
+        insights = [f"{self.row_count:,} lignes et {len(self.columns)} colonnes analysées"]
+        if self.date_min is not None:
+            insights.append(f"Période couverte : {self.period}")
+
+        for name, stats in self.columns.items():
+            info = stats.to_dict()
+            if info["type"] == "numeric" and any(
+                key in str(name).lower() for key in ("vente", "revenue", "ca", "quantit", "prix")
+            ):
+                insights.append(f"'{name}' : total {info['sum']:,.2f}, moyenne {info['mean']:,.2f}")
+        for name, stats in self.columns.items():
+            info = stats.to_dict()
+            if info["type"] == "text" and info["top"] is not None and name not in self.date_columns:
+                insights.append(
+                    f"Valeur la plus fréquente de '{name}' : {info['top']} ({info['top_count']:,} fois)"
+                )
+        for name, stats in self.columns.items():
+            if self.row_count and stats.nulls:
+                insights.append(f"'{name}' : {stats.nulls / self.row_count:.1%} de valeurs manquantes")
+        return insights
+
+
+def _print_progress(progress: Dict[str, Any]) -> None:
+    percent = f"{progress['percent']:5.1f}%" if progress["percent"] is not None else "  ?  "
+    sys.stdout.write(
+        f"\r⏳ {percent} - {progress['rows']:,} lignes ({progress['rows_per_sec']:,.0f} lignes/s)"
+    )
+    sys.stdout.flush()
+
+
+def _default_workers() -> int:
+    """Nombre de processus d'analyse : MAX_WORKERS (.env), sinon nombre de cœurs"""
+    try:
+        return max(1, int(os.getenv("MAX_WORKERS", "")))
+    except ValueError:
+        return os.cpu_count() or 1
+
+
+def _profile_file(file_path: str, chunk_size: int):
+    """Tâche exécutée dans un processus du pool (doit rester au niveau module)"""
+    return DataAnalyzer(chunk_size).profile_csv(file_path)
+
+
+class DataAnalyzer:
+    """Analyse de fichiers de données commerciales"""
+
+    def __init__(self, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        Args:
+            chunk_size: Nombre de lignes lues par bloc (borne la mémoire)
+        """
+        self.chunk_size = chunk_size
+
+    def profile_csv(self, file_path: str, chunk_size: Optional[int] = None,
+                    progress: Union[bool, Callable[[Dict[str, Any]], None]] = False,
+                    **read_csv_kwargs) -> DatasetProfile:
+        """
+        Construit le profil d'un CSV en une seule passe par blocs.
+
+        Args:
+            file_path: Chemin du fichier CSV
+            chunk_size: Lignes par bloc (défaut: valeur du constructeur)
+            progress: True pour afficher l'avancement, ou fonction appelée
+                après chaque bloc avec {rows, bytes, percent, rows_per_sec}
+        """
+        chunk_size = chunk_size or self.chunk_size
+        if chunk_size < 1:
+            raise ValueError("chunk_size doit être >= 1")
+        report = _print_progress if progress is True else (progress or None)
+
+        total_bytes = os.path.getsize(file_path)
+        profile = DatasetProfile()
+        start = time.perf_counter()
+        with open(file_path, 'rb') as fh:
+            for chunk in pd.read_csv(fh, chunksize=chunk_size, **read_csv_kwargs):
+                profile.update(chunk)
+                if report:
+                    elapsed = time.perf_counter() - start
+                    position = fh.tell()
+                    report({
+                        "rows": profile.row_count,
+                        "bytes": position,
+                        "percent": 100 * position / total_bytes if total_bytes else None,
+                        "rows_per_sec": profile.row_count / elapsed if elapsed > 0 else 0.0,
+                    })
+        if progress is True:
+            print()
+        return profile
+
+    def analyze_csv(self, file_path: str, chunk_size: Optional[int] = None,
+                    progress: Union[bool, Callable[[Dict[str, Any]], None]] = False) -> Dict[str, Any]:
+        """
+        Analyse un fichier CSV sans le charger entièrement en mémoire.
+
+        Returns:
+            {"success": True, "statistics": {...}, "insights": [...]} ou
+            {"success": False, "error": "..."}
+        """
+        try:
+            profile = self.profile_csv(file_path, chunk_size=chunk_size, progress=progress)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+        return {
+            "success": True,
+            "file": str(file_path),
+            "statistics": profile.statistics(),
+            "insights": profile.insights(),
+        }
+
+    def analyze_files(self, paths: Union[str, List[str]], pattern: str = "*.csv",
+                      max_workers: Optional[int] = None,
+                      chunk_size: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Analyse plusieurs CSV en parallèle et fusionne leurs statistiques.
+
+        Chaque fichier est profilé dans un processus séparé ; les profils
+        partiels sont ensuite fusionnés en un seul résultat, au même format
+        que analyze_csv.
+
+        Args:
+            paths: Dossier, motif glob (ex: "data/historique/*.csv") ou liste de fichiers
+            pattern: Motif appliqué quand paths est un dossier
+            max_workers: Nombre de processus (défaut: MAX_WORKERS ou nombre de cœurs)
+            chunk_size: Lignes par bloc dans chaque processus
+        """
+        if isinstance(paths, str):
+            if os.path.isdir(paths):
+                files = sorted(glob.glob(os.path.join(paths, pattern)))
+            else:
+                files = sorted(glob.glob(paths))
+        else:
+            files = list(paths)
+        if not files:
+            return {"success": False, "error": f"Aucun fichier trouvé: {paths}"}
+
+        chunk_size = chunk_size or self.chunk_size
+        workers = min(max_workers or _default_workers(), len(files))
+        total_bytes = sum(os.path.getsize(f) for f in files)
+
+        profile = DatasetProfile()
+        errors = []
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_profile_file, f, chunk_size): f for f in files}
+            for done, future in enumerate(as_completed(futures), 1):
+                try:
+                    profile.merge(future.result())
+                except Exception as e:
+                    errors.append(f"{futures[future]}: {e}")
+                sys.stdout.write(f"\r⏳ {done}/{len(files)} fichiers")
+                sys.stdout.flush()
+        print()
+        elapsed = time.perf_counter() - start
+
+        return {
+            "success": len(errors) < len(files),
+            "error": "; ".join(errors) if len(errors) == len(files) else None,
+            "files": len(files),
+            "errors": errors,
+            "statistics": profile.statistics(),
+            "insights": profile.insights(),
+            "throughput": {
+                "workers": workers,
+                "seconds": elapsed,
+                "files_per_sec": len(files) / elapsed if elapsed > 0 else 0.0,
+                "mb_per_sec": total_bytes / 1e6 / elapsed if elapsed > 0 else 0.0,
+            },
+        }
+
+    @staticmethod
+    def format_results(results: Dict[str, Any]) -> str:
+        """Met en forme le résultat de analyze_csv pour l'affichage ou l'agent"""
+        if not results.get("success"):
+            return f"❌ Erreur: {results.get('error', 'Unknown error')}"
+        stats = results["statistics"]
+        lines = [
+            f"Lignes: {stats['row_count']}",
+            f"Colonnes: {stats['column_count']}",
+            f"Période: {stats['period']}",
+        ]
+        lines += [f"• {insight}" for insight in results.get("insights", [])]
+        return "\n".join(lines)
+
+    def analyze(self, query: str) -> str:
+        """Point d'entrée de l'outil LangChain : analyse le fichier CSV indiqué"""
+        path = str(query).strip().strip('"\'')
+        if not os.path.isfile(path):
+            return "❌ Indiquez le chemin d'un fichier CSV existant."
+        return self.format_results(self.analyze_csv(path))
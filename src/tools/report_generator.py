@@ -0,0 +1,340 @@
+# src/tools/report_generator.py
+"""
+Générateur de rapports commerciaux de DataBot.
+
+Un rapport est composé de sections indépendantes (indicateurs clés, top
+produits, alertes de stock, graphiques). Les données peuvent être un CSV ou
+un dossier de CSV (une partition par fichier, ex. un fichier par jour).
+
+Deux niveaux de cache, conservés sur disque entre deux exécutions :
+- par partition : les agrégats d'un fichier ne sont recalculés que si sa
+  date de modification ou sa taille a changé ;
+- par section : une section n'est régénérée que si l'empreinte de ses
+  entrées a changé (ex. une modification des stocks ne refait pas le top
+  produits).
+Chaque source de données et configuration (top_n, seuil de stock) a son
+propre fichier de cache : plusieurs générateurs partageant REPORT_DIR ne
+s'évincent pas.
+"""
+
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from modules.dataset_cache import load_dataset
+from src.router import STOCK_THRESHOLD, prepare_sales
+from src.utils.cache import normalize_question
+
+REPORT_CACHE_FILE = ".report_cache_{}.json"
+# À incrémenter quand le calcul ou la mise en forme d'une section change
+CACHE_FORMAT = 2
+STOCK_CRITICAL = int(os.getenv("STOCK_CRITICAL_THRESHOLD", "20"))
+
+# (section, mots-clés de la demande de l'agent)
+SECTIONS = [
+    ("kpis", ("indicateur", "kpi", "chiffre", "ca", "ventes", "synthese")),
+    ("top_produits", ("top", "meilleur", "classement", "produit")),
+    ("alertes_stock", ("stock", "rupture", "reapprovision", "alerte")),
+    ("graphiques", ("graphique", "graphe", "visualisation")),
+]
+
+
+def _digest(value: Any) -> str:
+    return hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _summarize_partition(path: str) -> Dict[str, Any]:
+    """
+    Agrégats d'un fichier : totaux et ventes par produit (additifs entre
+    partitions), stock par produit (la partition la plus récente l'emporte).
+    Chaque partie porte sa propre empreinte.
+    """
+    df = load_dataset(path, derive=prepare_sales)
+    totals = {
+        "rows": len(df),
+        "ventes": float(df["Ventes_Total"].sum()) if "Ventes_Total" in df else 0.0,
+        "ca": float(df["CA"].sum()) if "CA" in df else None,
+    }
+    products: Dict[str, List[float]] = {}
+    if "Produit" in df and "Ventes_Total" in df:
+        columns = ["Ventes_Total"] + (["CA"] if "CA" in df else [])
+        grouped = df.groupby("Produit", sort=False)[columns].sum()
+        products = {str(name): [float(v) for v in row] for name, row in zip(grouped.index, grouped.to_numpy())}
+    stock: Dict[str, float] = {}
+    if "Produit" in df and "Stock" in df:
+        stock = {str(k): float(v) for k, v in df.groupby("Produit", sort=False)["Stock"].last().items()}
+
+    summary = {"totals": totals, "products": products, "stock": stock}
+    summary["digests"] = {part: _digest(value) for part, value in summary.items()}
+    return summary
+
+
+class ReportGenerator:
+    """Rapports par sections, recalculées seulement quand leurs données changent"""
+
+    def __init__(self, data_path: Optional[str] = None, top_n: int = 10,
+                 stock_threshold: int = STOCK_THRESHOLD, cache_dir: Optional[str] = None):
+        """
+        Args:
+            data_path: CSV des ventes ou dossier de CSV (défaut: SALES_FILE, sinon ventes.csv)
+            top_n: Nombre de produits du classement
+            stock_threshold: Seuil d'alerte de stock (défaut: STOCK_WARNING_THRESHOLD)
+            cache_dir: Dossier du cache des sections (défaut: REPORT_DIR, sinon ./reports)
+        """
+        self.data_path = data_path or os.getenv("SALES_FILE", "ventes.csv")
+        self.top_n = top_n
+        self.stock_threshold = stock_threshold
+        self.cache_dir = cache_dir or os.getenv("REPORT_DIR", "./reports")
+        self._cache: Optional[Dict[str, Any]] = None
+        self.last_run: Dict[str, Any] = {}
+
+    # ------------------------------------------------------------------ cache
+
+    @property
+    def cache_path(self) -> str:
+        config = [os.path.abspath(self.data_path), self.top_n, self.stock_threshold]
+        return os.path.join(self.cache_dir, REPORT_CACHE_FILE.format(_digest(config)[:12]))
+
+    def _load_cache(self) -> Dict[str, Any]:
+        if self._cache is None:
+            try:
+                with open(self.cache_path, encoding="utf-8") as f:
+                    cache = json.load(f)
+                if cache.get("format") != CACHE_FORMAT:
+                    raise ValueError("format de cache obsolète")
+            except (OSError, ValueError):
+                cache = {"format": CACHE_FORMAT, "partitions": {}, "sections": {}}
+            self._cache = cache
+        return self._cache
+
+    def _save_cache(self) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._cache, f, ensure_ascii=False)
+        os.replace(tmp_path, self.cache_path)
+
+    def clear_cache(self) -> None:
+        """Oublie tous les agrégats et sections en cache"""
+        self._cache = {"format": CACHE_FORMAT, "partitions": {}, "sections": {}}
+        if os.path.exists(self.cache_path):
+            os.remove(self.cache_path)
+
+    # ----------------------------------------------------------- partitions
+
+    def _partition_files(self) -> List[str]:
+        path = Path(self.data_path)
+        if path.is_dir():
+            return [str(p) for p in sorted(path.rglob("*.csv")) if p.stat().st_size > 0]
+        if not path.exists():
+            raise FileNotFoundError(f"Données introuvables: {self.data_path}")
+        return [str(path)]
+
+    def _summaries(self) -> List[Dict[str, Any]]:
+        """Agrégats de chaque partition, relus seulement si le fichier a changé"""
+        cached = self._load_cache()["partitions"]
+        files = self._partition_files()
+        summaries = []
+        for path in files:
+            stat = os.stat(path)
+            version = f"{stat.st_mtime_ns}:{stat.st_size}"
+            entry = cached.get(path)
+            if entry is None or entry["version"] != version:
+                entry = {"version": version, "summary": _summarize_partition(path)}
+                cached[path] = entry
+                self.last_run["partitions_read"] += 1
+            summaries.append(entry["summary"])
+        for path in set(cached) - set(files):
+            del cached[path]
+        return summaries
+
+    # -------------------------------------------------------------- sections
+
+    def _section(self, name: str, key_parts: Any, render: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Section en cache si ses entrées n'ont pas changé, sinon render()"""
+        sections = self._load_cache()["sections"]
+        key = _digest([name, key_parts])
+        entry = sections.get(name)
+        if (entry is not None and entry["key"] == key
+                and all(os.path.exists(p) for p in entry.get("files", []))):
+            self.last_run["reused"].append(name)
+            return entry
+        entry = {"key": key, **render()}
+        if not entry.pop("transient", False):   # un échec n'est pas mis en cache
+            sections[name] = entry
+        self.last_run["recomputed"].append(name)
+        return entry
+
+    @staticmethod
+    def _parts(summaries: List[Dict[str, Any]], part: str) -> List[str]:
+        return [s["digests"][part] for s in summaries]
+
+    @staticmethod
+    def _merged_stock(summaries: List[Dict[str, Any]]) -> Dict[str, float]:
+        stock: Dict[str, float] = {}
+        for summary in summaries:   # partitions triées : la plus récente l'emporte
+            stock.update(summary["stock"])
+        return stock
+
+    def _render_kpis(self, summaries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        rows = sum(s["totals"]["rows"] for s in summaries)
+        ventes = sum(s["totals"]["ventes"] for s in summaries)
+        ca_values = [s["totals"]["ca"] for s in summaries if s["totals"]["ca"] is not None]
+        products = set().union(*(s["products"] for s in summaries)) if summaries else set()
+        lines = [
+            "## 📈 Indicateurs clés",
+            f"- **Lignes analysées** : {rows:,}",
+            f"- **Produits** : {len(products):,}",
+            f"- **Ventes totales** : {ventes:,.0f} unités",
+        ]
+        if ca_values:
+            ca = sum(ca_values)
+            lines.append(f"- **Chiffre d'affaires** : {ca:,.2f} €")
+            if ventes:
+                lines.append(f"- **Valeur moyenne par vente** : {ca / ventes:,.2f} €")
+        stock = self._merged_stock(summaries)
+        if stock:
+            lines.append(f"- **Stock total** : {sum(stock.values()):,.0f} unités")
+        return {"content": "\n".join(lines)}
+
+    def _render_top(self, summaries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        merged: Dict[str, List[float]] = {}
+        for summary in summaries:
+            for product, values in summary["products"].items():
+                total = merged.setdefault(product, [0.0] * len(values))
+                for i, value in enumerate(values[:len(total)]):
+                    total[i] += value
+        top = sorted(merged.items(), key=lambda item: item[1][0], reverse=True)[:self.top_n]
+        lines = ["## 🏆 Top produits"]
+        for rank, (product, values) in enumerate(top, 1):
+            revenue = f" ({values[1]:,.2f} €)" if len(values) > 1 else ""
+            lines.append(f"{rank}. **{product}** : {values[0]:,.0f} ventes{revenue}")
+        if not top:
+            lines.append("Aucune donnée de vente par produit.")
+        return {"content": "\n".join(lines), "data": [[p, v[0]] for p, v in top]}
+
+    def _render_stock(self, summaries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        stock = self._merged_stock(summaries)
+        lines = ["## ⚠️ Alertes de stock"]
+        if not stock:
+            lines.append("Aucune donnée de stock.")
+        alerts = sorted((qty, product) for product, qty in stock.items() if qty < self.stock_threshold)
+        for qty, product in alerts:
+            level = "🔴 critique" if qty < STOCK_CRITICAL else "🟠 faible"
+            lines.append(f"- **{product}** : {qty:,.0f} unités ({level})")
+        if stock and not alerts:
+            lines.append(f"✅ Stock suffisant pour tous les produits (seuil : {self.stock_threshold})")
+        return {"content": "\n".join(lines)}
+
+    def _render_charts(self, top: Dict[str, Any], output_dir: str) -> Dict[str, Any]:
+        try:
+            import pandas as pd
+            from modules.chart_generator import ChartGenerator
+        except ImportError:
+            return {"content": "## 📊 Graphiques\nGraphiques indisponibles (plotly non installé).", "transient": True}
+
+        if not top.get("data"):
+            return {"content": "## 📊 Graphiques\nAucune donnée à représenter."}
+        data = pd.DataFrame(top["data"], columns=["Produit", "Ventes"])
+        fig = ChartGenerator.generate_sales_bar(data, x_col="Produit", y_col="Ventes",
+                                                title="Ventes des meilleurs produits")
+        if fig is None:
+            return {"content": "## 📊 Graphiques\nErreur lors de la génération du graphique.", "transient": True}
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, "top_produits.html")
+        fig.write_html(path, include_plotlyjs="cdn")
+        return {"content": f"## 📊 Graphiques\n- Ventes des meilleurs produits : `{path}`", "files": [path]}
+
+    def build_sections(self, names: Optional[List[str]] = None,
+                       output_dir: Optional[str] = None) -> Dict[str, str]:
+        """
+        Calcule les sections demandées (toutes par défaut), depuis le cache
+        quand leurs entrées n'ont pas changé.
+
+        Args:
+            names: Sections parmi kpis, top_produits, alertes_stock, graphiques
+            output_dir: Dossier des fichiers produits par la section graphiques
+
+        Returns:
+            Contenu Markdown de chaque section, dans l'ordre du rapport
+        """
+        names = names or [name for name, _ in SECTIONS]
+        output_dir = output_dir or self.cache_dir
+        self.last_run = {"partitions_read": 0, "reused": [], "recomputed": []}
+        start = time.perf_counter()
+
+        summaries = self._summaries()
+        results: Dict[str, Dict[str, Any]] = {}
+        if "kpis" in names:
+            results["kpis"] = self._section(
+                "kpis", [self._parts(summaries, "totals"), self._parts(summaries, "products"),
+                         self._parts(summaries, "stock")],
+                lambda: self._render_kpis(summaries))
+        if "top_produits" in names or "graphiques" in names:
+            results["top_produits"] = self._section(
+                "top_produits", [self._parts(summaries, "products"), self.top_n],
+                lambda: self._render_top(summaries))
+        if "alertes_stock" in names:
+            results["alertes_stock"] = self._section(
+                "alertes_stock", [self._parts(summaries, "stock"), self.stock_threshold, STOCK_CRITICAL],
+                lambda: self._render_stock(summaries))
+        if "graphiques" in names:
+            top = results["top_produits"]
+            results["graphiques"] = self._section(
+                "graphiques", [top["key"], os.path.abspath(output_dir)],
+                lambda: self._render_charts(top, output_dir))
+
+        self._save_cache()
+        self.last_run["files"] = len(summaries)
+        self.last_run["seconds"] = time.perf_counter() - start
+        return {name: results[name]["content"] for name, _ in SECTIONS if name in names}
+
+    def _header(self) -> str:
+        files = self.last_run.get("files", 0)
+        return (f"# 📊 RAPPORT COMMERCIAL - {datetime.now().strftime('%d/%m/%Y %H:%M')}\n\n"
+                f"*Source : {self.data_path} ({files} fichier(s))*")
+
+    def generate_comprehensive_report(self, output_dir: str = "reports") -> str:
+        """
+        Génère le rapport complet (Markdown) et ses graphiques.
+
+        Args:
+            output_dir: Dossier de destination
+
+        Returns:
+            Chemin du rapport
+        """
+        sections = self.build_sections(output_dir=output_dir)
+        report = "\n\n".join([self._header(), *sections.values()]) + "\n"
+
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, f"rapport_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(report)
+
+        run = self.last_run
+        print(f"♻️  {len(run['reused'])} section(s) réutilisée(s), {len(run['recomputed'])} recalculée(s), "
+              f"{run['partitions_read']}/{run['files']} fichier(s) relu(s) en {run['seconds']:.2f}s")
+        return path
+
+    def generate(self, query: str = "") -> str:
+        """
+        Point d'entrée de l'outil de l'agent : rapport texte, sans graphiques.
+
+        Si la demande cite une section (stock, top produits...), seules les
+        sections concernées sont produites.
+        """
+        words = normalize_question(query).replace("'", " ").split()
+        # Mots courts (ca, kpi) exacts, les autres par préfixe (produit -> produits)
+        names = [name for name, keywords in SECTIONS
+                 if name != "graphiques" and any(w == k or (len(k) > 3 and w.startswith(k))
+                                                 for w in words for k in keywords)]
+        try:
+            sections = self.build_sections(names or [n for n, _ in SECTIONS if n != "graphiques"])
+        except Exception as e:
+            return f"❌ Erreur génération rapport: {e}"
+        return "\n\n".join([self._header(), *sections.values()])
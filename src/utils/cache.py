@@ -0,0 +1,143 @@
+"""
+Cache des réponses de DataBot.
+
+Une réponse est indexée par la question normalisée et par l'empreinte des
+données : si les fichiers changent, les anciennes réponses ne sont plus
+servies. Niveau mémoire LRU borné + niveau disque (SQLite) optionnel.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+def normalize_question(question: str) -> str:
+    """Minuscules, sans accents, espaces et ponctuation finale uniformisés"""
+    text = unicodedata.normalize("NFKD", str(question).lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.rstrip(" ?!.")
+
+
+class ResponseCache:
+    """Cache TTL des réponses, en mémoire (LRU) et optionnellement sur disque"""
+
+    def __init__(self, ttl: float = 300, max_entries: int = 256, persist_path: Optional[str] = None):
+        """
+        Args:
+            ttl: Durée de validité d'une réponse en secondes
+            max_entries: Nombre maximum de réponses gardées en mémoire
+            persist_path: Fichier SQLite du niveau persistant (désactivé si None)
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._disk = None
+        if persist_path:
+            os.makedirs(os.path.dirname(os.path.abspath(persist_path)), exist_ok=True)
+            self._disk = sqlite3.connect(persist_path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, answer TEXT, expires_at REAL)"
+            )
+            self._disk.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+            self._disk.commit()
+
+    @staticmethod
+    def make_key(question: str, data_version: str = "") -> str:
+        raw = f"{normalize_question(question)}\0{data_version}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get(self, question: str, data_version: str = "") -> Optional[str]:
+        """Retourne la réponse en cache, ou None si absente ou expirée"""
+        key = self.make_key(question, data_version)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._memory[key]
+
+            if self._disk is not None:
+                row = self._disk.execute(
+                    "SELECT answer, expires_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[1] > now:
+                    self._store(key, row[0], row[1])
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return row[0]
+
+            self.misses += 1
+            return None
+
+    def set(self, question: str, answer: str, data_version: str = "") -> None:
+        """Enregistre une réponse"""
+        key = self.make_key(question, data_version)
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._store(key, answer, expires_at)
+            if self._disk is not None:
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO responses (key, answer, expires_at) VALUES (?, ?, ?)",
+                    (key, answer, expires_at)
+                )
+                self._disk.commit()
+
+    def _store(self, key: str, answer: str, expires_at: float) -> None:
+        self._memory[key] = (expires_at, answer)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Vide les deux niveaux du cache"""
+        with self._lock:
+            self._memory.clear()
+            if self._disk is not None:
+                self._disk.execute("DELETE FROM responses")
+                self._disk.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistiques succès/échecs"""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._memory),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+def create_response_cache() -> Optional[ResponseCache]:
+    """
+    Crée le cache à partir des variables d'environnement.
+
+    CACHE_ENABLED (True/False), CACHE_TTL (secondes), CACHE_MAX_ENTRIES,
+    CACHE_PATH (fichier SQLite du niveau persistant, optionnel).
+    """
+    if os.getenv("CACHE_ENABLED", "True").strip().lower() not in ("1", "true", "yes", "on"):
+        return None
+    return ResponseCache(
+        ttl=float(os.getenv("CACHE_TTL", "300")),
+        max_entries=int(os.getenv("CACHE_MAX_ENTRIES", "256")),
+        persist_path=os.getenv("CACHE_PATH") or None,
+    )
@@ -0,0 +1,82 @@
+"""
+Profil du temps d'import au démarrage.
+
+Lance `python -X importtime -c "import <module>"` dans un processus neuf
+(les modules déjà importés ne faussent donc pas la mesure) et résume la
+sortie : temps total, modules les plus coûteux et modules lourds chargés
+alors qu'ils ne devraient pas l'être.
+"""
+
+import os
+import subprocess
+import sys
+from typing import Any, Dict, Iterable, List, Optional
+
+# Modules qui ne doivent pas être chargés par le démarrage de la CLI :
+# ils ne servent qu'au mode interactif / lot (agent IA)
+HEAVY_MODULES = ("langchain", "langchain_core", "langchain_mistralai", "mistralai", "openai",
+                 "streamlit", "plotly")
+
+
+def parse_importtime(output: str) -> List[Dict[str, Any]]:
+    """
+    Analyse la sortie de -X importtime.
+
+    Returns:
+        Une entrée par module : name, self_us, cumulative_us, depth
+        (0 pour les imports de premier niveau)
+    """
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            entries.append({
+                "name": name.strip(),
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            })
+        except ValueError:
+            continue
+    return entries
+
+
+def profile_imports(module: str = "src.main", top: int = 15, cwd: Optional[str] = None,
+                    forbidden: Iterable[str] = HEAVY_MODULES) -> Dict[str, Any]:
+    """
+    Mesure le temps d'import d'un module dans un nouvel interpréteur.
+
+    Args:
+        module: Module à importer
+        top: Nombre de modules à garder dans le classement
+        cwd: Dossier de travail du sous-processus (défaut: racine du projet)
+        forbidden: Paquets racines dont le chargement est signalé
+
+    Returns:
+        Dictionnaire avec total_ms, modules, top, forbidden_loaded et error
+    """
+    cwd = cwd or os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, capture_output=True, text=True
+    )
+    entries = parse_importtime(result.stderr)
+    roots = {name.split(".")[0] for name in forbidden}
+    loaded = sorted({e["name"] for e in entries if e["name"].split(".")[0] in roots
+                     and "." not in e["name"]})
+
+    error = None
+    if result.returncode != 0:
+        lines = result.stderr.strip().splitlines()
+        error = lines[-1] if lines else f"code retour {result.returncode}"
+
+    return {
+        "module": module,
+        "total_ms": sum(e["cumulative_us"] for e in entries if e["depth"] == 0) / 1000,
+        "modules": len(entries),
+        "top": sorted(entries, key=lambda e: e["cumulative_us"], reverse=True)[:top],
+        "forbidden_loaded": loaded,
+        "error": error,
+    }
@@ -0,0 +1,54 @@
+# tests/test_db_connector.py
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.db_connector import DatabaseConnector
+
+
+def test_add_sales_with_blank_quantity_and_revenue(tmp_path):
+    """Des cellules vides ne doivent pas casser les agrégats (colonnes NOT NULL)"""
+    db_path = tmp_path / "ventes.db"
+    db = DatabaseConnector(str(db_path))
+    sales = pd.DataFrame({
+        "date": ["2024-01-05", "2024-01-05", "2024-01-06"],
+        "product": ["Souris Pro", "Souris Pro", "Laptop Elite"],
+        "quantity": [3, np.nan, 1],
+        "revenue": [np.nan, 80.0, 1299.99],
+        "category": ["Périphérique", "Périphérique", "Informatique"],
+    })
+    assert db.add_sales(sales, verbose=False)["rows"] == 3
+    db.close()
+
+    conn = sqlite3.connect(db_path)
+    raw = conn.execute("SELECT quantity, revenue FROM sales WHERE product = 'Souris Pro' ORDER BY id").fetchall()
+    assert raw == [(3, None), (None, 80.0)]
+    rollup = conn.execute(
+        "SELECT quantity, revenue FROM daily_product_sales WHERE date = '2024-01-05' AND product = 'Souris Pro'"
+    ).fetchone()
+    assert rollup == (3, 80.0)
+    conn.close()
+
+
+def test_parquet_backend_matches_sqlite_with_blank_cells(tmp_path):
+    """Dates, produits et quantités vides : mêmes totaux que le moteur SQLite"""
+    pytest.importorskip("pyarrow")
+    sales = pd.DataFrame({
+        "date": ["2024-01-05", None, np.nan, "2024-02-01"],
+        "product": ["Souris Pro", np.nan, "Laptop Elite", "Souris Pro"],
+        "quantity": [1, np.nan, 3, 4],
+        "revenue": [80.0, 2.0, np.nan, 320.0],
+        "category": ["Périphérique", "Périphérique", None, "Périphérique"],
+    })
+    results = {}
+    for backend in ("sqlite", "parquet"):
+        db = DatabaseConnector(str(tmp_path / backend), backend=backend)
+        assert db.get_sales_data().empty
+        db.add_sales(sales, verbose=False)
+        results[backend] = (db.get_sales_data(), db.get_category_data())
+        db.close()
+
+    for sqlite_frame, parquet_frame in zip(results["sqlite"], results["parquet"]):
+        pd.testing.assert_frame_equal(sqlite_frame, parquet_frame)
@@ -1,8 +1,18 @@
 # webapp/app_streamlit.py - VERSION GARANTIE
+import os
+import sys
+import uuid
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 
+# Racine du projet (pour importer src/ et modules/)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from modules.chart_generator import ChartGenerator
+
 # CONFIGURATION DE BASE
 st.set_page_config(
     page_title="DataBot - Assistant Commercial",
@@ -18,16 +28,93 @@ st.markdown("---")
 # SECTION 1 : DONNÉES DE DÉMO (TOUJOURS VISIBLE)
 st.header("📊 Données de Démonstration")
 
-# Création de données garanties
-data = {
+# Données garanties (remplacées par DASHBOARD_FILE s'il est défini)
+DONNEES_DEMO = {
     'Produit': ['Laptop Pro', 'Souris Gaming', 'Clavier Méca', 'Écran 27"', 'Casque Bluetooth'],
     'Catégorie': ['Informatique', 'Périphérique', 'Périphérique', 'Informatique', 'Audio'],
     'Ventes': [150, 320, 180, 85, 210],
     'Prix (€)': [1299.99, 79.99, 149.99, 449.99, 199.99],
     'Stock': [42, 115, 78, 28, 55]
 }
+FICHIER_DONNEES = os.getenv("DASHBOARD_FILE")
+
+
+def version_donnees():
+    """Empreinte des données : chaque widget relance le script, seul un changement la modifie"""
+    if FICHIER_DONNEES and os.path.exists(FICHIER_DONNEES):
+        stat = os.stat(FICHIER_DONNEES)
+        return f"{FICHIER_DONNEES}:{stat.st_mtime_ns}:{stat.st_size}"
+    return "demo"
+
+
+# Les fonctions suivantes ne sont recalculées que pour une nouvelle version
+@st.cache_resource(show_spinner=False, max_entries=4)
+def charger_donnees(version):
+    """DataFrame partagé entre les relances et les sessions (ne pas le modifier)"""
+    if version != "demo":
+        return pd.read_csv(FICHIER_DONNEES)
+    return pd.DataFrame(DONNEES_DEMO)
 
-df = pd.DataFrame(data)
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def calculer_metriques(version):
+    df = charger_donnees(version)
+    return {
+        "total_ventes": int(df['Ventes'].sum()),
+        "ca_total": float((df['Ventes'] * df['Prix (€)']).sum()),
+        "stock_faible": int((df['Stock'] < 50).sum()),
+        "prix_moyen": float(df['Prix (€)'].mean()),
+    }
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def construire_figures(version):
+    """Figures partagées entre les relances et les sessions (ne pas les modifier)"""
+    df = charger_donnees(version)
+    fig1 = px.bar(
+        df,
+        x='Produit',
+        y='Ventes',
+        color='Catégorie',
+        title="Ventes par Produit"
+    )
+    fig2 = px.pie(
+        df,
+        values='Prix (€)',
+        names='Produit',
+        title="Répartition des Prix"
+    )
+    # WebGL ou carte de densité automatiquement sur de gros fichiers
+    fig3 = ChartGenerator.generate_scatter(
+        df,
+        x_col='Prix (€)',
+        y_col='Ventes',
+        size_col='Stock',
+        color_col='Catégorie',
+        hover_col='Produit',
+        title="Relation Prix-Ventes-Stock"
+    )
+    return fig1, fig2, fig3
+
+
+def invalider_donnees():
+    """Oublie les données, métriques et figures en cache"""
+    charger_donnees.clear()
+    calculer_metriques.clear()
+    construire_figures.clear()
+
+
+if st.sidebar.button("🔄 Recharger les données"):
+    invalider_donnees()
+
+version = version_donnees()
+df = charger_donnees(version)
+metriques = calculer_metriques(version)
+total_ventes = metriques["total_ventes"]
+ca_total = metriques["ca_total"]
+stock_faible = metriques["stock_faible"]
+prix_moyen = metriques["prix_moyen"]
+fig1, fig2, fig3 = construire_figures(version)
 
 # Afficher le tableau TOUJOURS visible
 st.subheader("Tableau des Produits")
@@ -39,19 +126,15 @@ st.header("📈 Métriques Clés")
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
-    total_ventes = df['Ventes'].sum()
     st.metric("Ventes Total", f"{total_ventes:,}", "+12.5%")
 
 with col2:
-    ca_total = (df['Ventes'] * df['Prix (€)']).sum()
     st.metric("Chiffre d'Affaires", f"{ca_total:,.0f} €", "+8.2%")
 
 with col3:
-    stock_faible = len(df[df['Stock'] < 50])
     st.metric("Stock Critique", stock_faible, "⚠️" if stock_faible > 0 else "✅")
 
 with col4:
-    prix_moyen = df['Prix (€)'].mean()
     st.metric("Prix Moyen", f"{prix_moyen:.0f} €", "-2.1%")
 
 # SECTION 3 : VISUALISATIONS (TOUJOURS VISIBLE)
@@ -61,90 +144,91 @@ st.header("📊 Visualisations")
 tab1, tab2, tab3 = st.tabs(["📦 Ventes", "💰 Prix", "📈 Relation"])
 
 with tab1:
-    fig1 = px.bar(
-        df,
-        x='Produit',
-        y='Ventes',
-        color='Catégorie',
-        title="Ventes par Produit"
-    )
     st.plotly_chart(fig1, use_container_width=True)
 
 with tab2:
-    fig2 = px.pie(
-        df,
-        values='Prix (€)',
-        names='Produit',
-        title="Répartition des Prix"
-    )
     st.plotly_chart(fig2, use_container_width=True)
 
 with tab3:
-    fig3 = px.scatter(
-        df,
-        x='Prix (€)',
-        y='Ventes',
-        size='Stock',
-        color='Catégorie',
-        hover_name='Produit',
-        title="Relation Prix-Ventes-Stock"
-    )
     st.plotly_chart(fig3, use_container_width=True)
 
-# SECTION 4 : SIMULATEUR D'IA (TOUJOURS VISIBLE)
-st.header("💬 Assistant IA - Simulation")
+# SECTION 4 : ASSISTANT IA (TOUJOURS VISIBLE)
+@st.cache_resource(show_spinner=False)
+def charger_databot():
+    """Agent IA partagé entre les sessions, None sans clé API ou sans LangChain"""
+    if not os.getenv("MISTRAL_API_KEY"):
+        return None
+    try:
+        from src.agent import DataBot
+        return DataBot()
+    except Exception:
+        return None
+
+@st.cache_resource(show_spinner=False)
+def charger_sessions():
+    """Mémoires de conversation de toutes les sessions (bornées, évincées sur disque)"""
+    from modules.session_store import create_session_store
+    return create_session_store()
+
+bot = charger_databot()
+sessions = charger_sessions()
+st.header("💬 Assistant IA" if bot is not None else "💬 Assistant IA - Simulation")
 
 # Initialisation session
-if "messages" not in st.session_state:
-    st.session_state.messages = [
-        {"role": "assistant", "content": "Bonjour ! Je suis DataBot. Posez-moi des questions sur vos données commerciales."}
-    ]
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
 
 # Afficher historique
-for message in st.session_state.messages:
-    with st.chat_message(message["role"]):
-        st.write(message["content"])
+with st.chat_message("assistant"):
+    st.write("Bonjour ! Je suis DataBot. Posez-moi des questions sur vos données commerciales.")
+for message in sessions.get(st.session_state.session_id).history:
+    with st.chat_message("user" if message.role == "human" else "assistant"):
+        st.write(message.content)
 
 # Input utilisateur
 prompt = st.chat_input("Ex: 'Quel produit a les meilleures ventes ?'")
 
 if prompt:
-    # Ajouter message utilisateur
-    st.session_state.messages.append({"role": "user", "content": prompt})
+    with st.chat_message("user"):
+        st.write(prompt)
     
-    # Simuler réponse IA
     with st.chat_message("assistant"):
-        with st.spinner("DataBot analyse..."):
-            # Logique de réponse simple
-            if "ventes" in prompt.lower() and "meilleur" in prompt.lower():
-                meilleur = df.loc[df['Ventes'].idxmax()]
-                reponse = f"**Produit avec les meilleures ventes** : {meilleur['Produit']} ({meilleur['Ventes']} unités)"
-            
-            elif "stock" in prompt.lower() and "faible" in prompt.lower():
-                faibles = df[df['Stock'] < 50]
-                if len(faibles) > 0:
-                    liste = ", ".join(faibles['Produit'].tolist())
-                    reponse = f"⚠️ **Produits en stock faible** : {liste}"
+        if bot is not None:
+            # Réponse affichée au fil des jetons
+            reponse = st.write_stream(bot.stream_text(prompt))
+        else:
+            # Simuler réponse IA
+            with st.spinner("DataBot analyse..."):
+                # Logique de réponse simple
+                if "ventes" in prompt.lower() and "meilleur" in prompt.lower():
+                    meilleur = df.loc[df['Ventes'].idxmax()]
+                    reponse = f"**Produit avec les meilleures ventes** : {meilleur['Produit']} ({meilleur['Ventes']} unités)"
+                
+                elif "stock" in prompt.lower() and "faible" in prompt.lower():
+                    faibles = df[df['Stock'] < 50]
+                    if len(faibles) > 0:
+                        liste = ", ".join(faibles['Produit'].tolist())
+                        reponse = f"⚠️ **Produits en stock faible** : {liste}"
+                    else:
+                        reponse = "✅ **Tous les produits ont un stock suffisant**"
+                
+                elif "prix" in prompt.lower() and "moyen" in prompt.lower():
+                    reponse = f"**Prix moyen des produits** : {prix_moyen:.2f} €"
+                
+                elif "bonjour" in prompt.lower() or "salut" in prompt.lower():
+                    reponse = "Bonjour ! Je suis DataBot, votre assistant commercial IA. Posez-moi des questions sur vos ventes, stocks ou performances."
+                
                 else:
-                    reponse = "✅ **Tous les produits ont un stock suffisant**"
-            
-            elif "prix" in prompt.lower() and "moyen" in prompt.lower():
-                reponse = f"**Prix moyen des produits** : {prix_moyen:.2f} €"
-            
-            elif "bonjour" in prompt.lower() or "salut" in prompt.lower():
-                reponse = "Bonjour ! Je suis DataBot, votre assistant commercial IA. Posez-moi des questions sur vos ventes, stocks ou performances."
-            
-            else:
-                reponse = f"**Analyse de votre demande** : '{prompt}'\n\n"
-                reponse += f"Basé sur nos données ({len(df)} produits) :\n"
-                reponse += f"- Ventes totales : {total_ventes} unités\n"
-                reponse += f"- CA généré : {ca_total:,.0f} €\n"
-                reponse += f"- {stock_faible} produit(s) nécessite(nt) réapprovisionnement"
-            
-            st.write(reponse)
+                    reponse = f"**Analyse de votre demande** : '{prompt}'\n\n"
+                    reponse += f"Basé sur nos données ({len(df)} produits) :\n"
+                    reponse += f"- Ventes totales : {total_ventes} unités\n"
+                    reponse += f"- CA généré : {ca_total:,.0f} €\n"
+                    reponse += f"- {stock_faible} produit(s) nécessite(nt) réapprovisionnement"
+                
+                st.write(reponse)
     
     # Ajouter à l'historique
-    st.session_state.messages.append({"role": "assistant", "content": reponse})
+    sessions.add_conversation(st.session_state.session_id, prompt, reponse)
 
 # SECTION 5 : RAPPORTS (TOUJOURS VISIBLE)
 st.header("📋 Génération de Rapports")
@@ -190,8 +274,16 @@ with col_exp1:
 
 with col_exp2:
     if st.button("📊 Exporter Graphiques", use_container_width=True):
-        fig1.write_image("ventes_par_produit.png")
-        st.success("✅ Graphiques exportés")
+        with st.spinner("Export des graphiques..."):
+            export = ChartGenerator.export_charts(
+                {"ventes_par_produit": fig1, "repartition_prix": fig2, "relation_prix_ventes": fig3},
+                output_dir=os.getenv("EXPORT_DIR", "./exports"),
+                formats=("png", "svg")
+            )
+        if export["success"]:
+            st.success(f"✅ {len(export['paths'])} graphiques exportés en {export['seconds']:.1f}s")
+        else:
+            st.error(f"❌ Export impossible : {export['error']}")
 
 with col_exp3:
     if st.button("🖨️ Copier Rapport", use_container_width=True):
@@ -208,4 +300,7 @@ st.markdown("""
 
 # MESSAGE DE DÉBOGAGE (visible en bas)
 st.sidebar.markdown("---")
-st.sidebar.caption(f"Debug : {len(df)} lignes | Streamlit OK")
\ No newline at end of file
+st.sidebar.caption(f"Debug : {len(df)} lignes | Streamlit OK")
+st.sidebar.caption(f"Sessions en mémoire : {sessions.stats()['sessions']}")
+if bot is not None and bot.latency_stats().get("questions"):
+    st.sidebar.caption(f"Premier jeton (médiane) : {bot.latency_stats()['ttft_p50']:.2f}s")
\ No newline at end of file